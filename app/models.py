@@ -11,7 +11,7 @@ from flask import current_app
 from flask_login import UserMixin
 from datetime import datetime
 from slugify import slugify
-from sqlalchemy.orm import synonym
+from sqlalchemy.orm import declared_attr, synonym
 from sqlalchemy.exc import SQLAlchemyError
 import traceback
 
@@ -75,7 +75,7 @@ class User(UserMixin, db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False, index=True)
-    email = db.Column(db.String(255), unique=True, index=True)
+    email = db.Column(db.String(255))
     password_hash = db.Column('password_hash', db.String(255), nullable=False)
     password = synonym('password_hash')
     role = db.Column(db.String(50), nullable=False)
@@ -85,6 +85,11 @@ class User(UserMixin, db.Model):
     
     # Relationships
     orders = db.relationship('Order', backref='customer', lazy='dynamic', cascade='all, delete-orphan')
+
+    __table_args__ = (
+        # Email is optional; uniqueness applies to the accounts that have one.
+        db.Index('ix_users_email', 'email', unique=True, postgresql_where=db.text('email IS NOT NULL')),
+    )
     
     def set_password(self, password):
         """Hash and set user password."""
@@ -906,13 +911,16 @@ class Visitor(db.Model):
     email = db.Column(db.String(200))
     ip_address = db.Column(db.String(64), nullable=False)
     user_agent = db.Column(db.String(500))
-    page_visited = db.Column(db.String(255), nullable=False, index=True)
+    page_visited = db.Column(db.String(255), nullable=False)
     created_at = db.Column(
         db.DateTime,
         nullable=False,
         default=datetime.utcnow,
         server_default=db.func.now(),
-        index=True,
+    )
+
+    __table_args__ = (
+        db.Index('ix_visitors_created_at', 'created_at', postgresql_using='brin'),
     )
 
     def __repr__(self):
@@ -965,7 +973,7 @@ class RecentLog(db.Model):
     response_time_ms = db.Column(db.Float)
     referrer = db.Column(db.String(500))
     session_id = db.Column(db.String(120))
-    traffic_type = db.Column(db.String(16), nullable=False, index=True)  # human | bot | attack
+    traffic_type = db.Column(db.String(16), nullable=False)  # human | bot | attack
     is_search_bot = db.Column(db.Boolean, nullable=False, default=False)
 
     timestamp = db.Column(
@@ -977,7 +985,12 @@ class RecentLog(db.Model):
     )
 
     __table_args__ = (
-        db.Index('ix_recent_logs_type_time', 'traffic_type', 'timestamp'),
+        db.Index(
+            'ix_recent_logs_type_time',
+            'traffic_type',
+            'timestamp',
+            postgresql_include=['ip_address', 'id'],
+        ),
     )
 
 
@@ -992,7 +1005,6 @@ class _RequestLogBase(db.Model):
         nullable=False,
         default=datetime.utcnow,
         server_default=db.func.now(),
-        index=True,
     )
     ip_address = db.Column(db.String(64), nullable=False, index=True)
     route = db.Column(db.String(255), nullable=False, index=True)
@@ -1005,6 +1017,13 @@ class _RequestLogBase(db.Model):
     referrer = db.Column(db.String(500))
     session_id = db.Column(db.String(120))
 
+    @declared_attr
+    def __table_args__(cls):
+        # Append-only, only range-deleted by retention: BRIN on PostgreSQL.
+        return (
+            db.Index(f'ix_{cls.__tablename__}_timestamp', 'timestamp', postgresql_using='brin'),
+        )
+
 
 class VisitorLog(_RequestLogBase):
     __tablename__ = 'visitor_logs'
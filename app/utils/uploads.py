@@ -17,15 +17,15 @@ from app.utils.storage import CloudStorageConfigurationError, upload_to_cloud
 
 # MIME type whitelist for security (extension spoofing prevention)
 SAFE_MIME_TYPES = {
-    'image/jpeg': ['.jpg', '.jpeg'],
-    'image/png': ['.png'],
-    'image/gif': ['.gif'],
-    'image/webp': ['.webp'],
-    'application/pdf': ['.pdf'],
-    'application/dwg': ['.dwg'],
-    'application/x-autocad': ['.dwg'],
-    'application/msword': ['.doc'],
-    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': ['.docx'],
+    'image/jpeg': frozenset({'.jpg', '.jpeg'}),
+    'image/png': frozenset({'.png'}),
+    'image/gif': frozenset({'.gif'}),
+    'image/webp': frozenset({'.webp'}),
+    'application/pdf': frozenset({'.pdf'}),
+    'application/dwg': frozenset({'.dwg'}),
+    'application/x-autocad': frozenset({'.dwg'}),
+    'application/msword': frozenset({'.doc'}),
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': frozenset({'.docx'}),
 }
 
 
@@ -66,7 +66,7 @@ def _validate_file_content(file: FileStorage, filename: str) -> None:
         )
     
     ext = '.' + filename.rsplit('.', 1)[1].lower()
-    valid_extensions = SAFE_MIME_TYPES.get(actual_mime, [])
+    valid_extensions = SAFE_MIME_TYPES.get(actual_mime, frozenset())
     
     if ext not in valid_extensions:
         raise ValueError(
@@ -217,14 +217,17 @@ def resolve_protected_upload(relative_path: str) -> Path:
     if not clean_relative:
         raise ValueError('Empty file path received.')
 
-    parts = [part for part in Path(clean_relative).parts if part not in ('', '.', '..')]
-    if parts and parts[0].lower() == 'uploads':
-        parts = parts[1:]
-    if not parts:
+    # Anchoring at the root before normpath() collapses any '..' segments
+    # without ever climbing above the protected folder.
+    cleaned = os.path.normpath(os.sep + clean_relative).lstrip('/\\')
+    head, _, tail = cleaned.partition(os.sep)
+    if head.lower() == 'uploads':
+        cleaned = tail
+    if not cleaned or cleaned == '.':
         raise ValueError('Unable to resolve file path inside protected uploads.')
 
-    candidate = base_path.joinpath(*parts).resolve()
-    if os.path.commonpath([str(base_path), str(candidate)]) != str(base_path):
+    candidate = (base_path / cleaned).resolve()
+    if not str(candidate).startswith(str(base_path) + os.sep):
         raise ValueError('File path escapes protected upload directory.')
 
     return candidate
@@ -6,17 +6,19 @@ from app.models import HousePlan, Category, db
 app = create_app()
 
 with app.app_context():
-    # Check if plan already exists
-    plan = HousePlan.query.first()
+    # Check if plan already exists (pk-only probe, no ORM hydration)
+    existing_id = db.session.query(HousePlan.id).limit(1).scalar()
     
-    if plan:
+    if existing_id is not None:
+        plan = db.session.get(HousePlan, existing_id)
         print(f"✓ Plan already exists: {plan.title} ({plan.display_reference})")
     else:
         # Create test plan
         print("Creating test plan...")
         
         # Get or create category
-        category = Category.query.filter_by(slug='modern').first()
+        with db.session.no_autoflush:
+            category = Category.query.filter_by(slug='modern').first()
         if not category:
             category = Category(name='Modern', slug='modern', description='Modern house designs')
             db.session.add(category)
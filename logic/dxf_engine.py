@@ -17,20 +17,58 @@ Notes d'ingénierie:
 
 from __future__ import annotations
 
+import re
+from collections import defaultdict
 from dataclasses import dataclass
-from math import atan2, ceil, cos, pi, sin, sqrt
+from functools import lru_cache
+from math import ceil, hypot, pi
 from pathlib import Path
-from typing import Iterable, List, Sequence
 
+import numpy as np
 import pandas as pd
 
 
+_TWO_PI = 2.0 * pi
+_DEG2RAD = pi / 180.0
+
+# Pas angulaire par défaut de l'échantillonnage des arcs (5°), et son inverse:
+# le nombre de pas d'un arc devient une multiplication.
+_MAX_STEP_DEG = 5.0
+_MAX_STEP_RAD = _MAX_STEP_DEG * _DEG2RAD
+_INV_MAX_STEP = 1.0 / _MAX_STEP_RAD
+
+
 @dataclass(frozen=True)
 class TakeoffDiagnostic:
     niveau: str  # 'info' | 'warning' | 'error'
     message: str
 
 
+# Mapping "catégorie canonique" -> liste de mots clés possibles.
+# NB: on privilégie des tokens courts mais discriminants.
+_LAYER_KEYWORDS: dict[str, list[str]] = {
+    # Linéaires
+    'MURS': ['MUR', 'WALL', 'A-WALL', 'A_WALL', 'WALLS', 'CLOISON', 'CLSN'],
+    'FONDATIONS': ['FOND', 'FOUND', 'FOOT', 'FOOTING', 'SEMELLE', 'SML', 'RADIER'],
+    'POUTRES': ['POUTRE', 'BEAM', 'PTRL', 'LINTEAU'],
+    # Surfaces
+    'DALLES': ['DALLE', 'SLAB', 'PLANCHER', 'FLOOR', 'DALLAGE'],
+    'CHAPE': ['CHAPE', 'SCREED'],
+    'CARRELAGE': ['CARREL', 'TILE', 'FAIENCE', 'REVET', 'FINISH'],
+    # Unitaires (souvent représentés par blocs)
+    'POTEAUX': ['POTEAU', 'COLUMN', 'COLONNE', 'PILIER'],
+    'MENUISERIES': ['MENUIS', 'DOOR', 'PORTE', 'WINDOW', 'FEN', 'BAIE', 'VITR'],
+    'SANITAIRES': ['SANITA', 'WC', 'LAVABO', 'SINK', 'BATH', 'DOUCHE'],
+}
+
+# Une alternation par catégorie: un seul balayage du nom au lieu d'un test
+# d'inclusion par mot-clé.
+_LAYER_PATTERNS: tuple[tuple[str, re.Pattern[str]], ...] = tuple(
+    (category, re.compile('|'.join(map(re.escape, keys)))) for category, keys in _LAYER_KEYWORDS.items()
+)
+
+
+@lru_cache(maxsize=4096)
 def _norm_layer(layer: str | None) -> str:
     return (layer or '').strip().upper()
 
@@ -47,147 +85,129 @@ def identify_layer_category(layer_name: str | None) -> str | None:
     - Retourne une clé canonique (ex: "MURS", "DALLES", ...) ou None.
     """
 
-    name = _norm_layer(layer_name)
-    if not name:
-        return None
+    return _category_of_normalized(_norm_layer(layer_name))
 
-    # Mapping "catégorie canonique" -> liste de mots clés possibles.
-    # NB: on privilégie des tokens courts mais discriminants.
-    keywords: dict[str, list[str]] = {
-        # Linéaires
-        'MURS': ['MUR', 'WALL', 'A-WALL', 'A_WALL', 'WALLS', 'CLOISON', 'CLSN'],
-        'FONDATIONS': ['FOND', 'FOUND', 'FOOT', 'FOOTING', 'SEMELLE', 'SML', 'RADIER'],
-        'POUTRES': ['POUTRE', 'BEAM', 'PTRL', 'LINTEAU'],
-        # Surfaces
-        'DALLES': ['DALLE', 'SLAB', 'PLANCHER', 'FLOOR', 'DALLAGE'],
-        'CHAPE': ['CHAPE', 'SCREED'],
-        'CARRELAGE': ['CARREL', 'TILE', 'FAIENCE', 'REVET', 'FINISH'],
-        # Unitaires (souvent représentés par blocs)
-        'POTEAUX': ['POTEAU', 'COLUMN', 'COLONNE', 'PILIER'],
-        'MENUISERIES': ['MENUIS', 'DOOR', 'PORTE', 'WINDOW', 'FEN', 'BAIE', 'VITR'],
-        'SANITAIRES': ['SANITA', 'WC', 'LAVABO', 'SINK', 'BATH', 'DOUCHE'],
-    }
 
-    for category, keys in keywords.items():
-        for k in keys:
-            if k in name:
-                return category
-    return None
+@lru_cache(maxsize=4096)
+def _category_of_normalized(name: str) -> str | None:
+    """identify_layer_category pour un nom déjà normalisé (_norm_layer).
+
+    Mis en cache: un DXF compte des milliers d'entités pour quelques dizaines de
+    couches; le nom normalisé sert de clé canonique.
+    """
 
+    if not name:
+        return None
 
-def _distance(a: tuple[float, float], b: tuple[float, float]) -> float:
-    dx = b[0] - a[0]
-    dy = b[1] - a[1]
-    return sqrt(dx * dx + dy * dy)
+    # Catégories testées dans l'ordre de priorité du mapping (la première qui
+    # matche gagne), une recherche regex compilée par catégorie.
+    for category, pattern in _LAYER_PATTERNS:
+        if pattern.search(name):
+            return category
+    return None
 
 
-def _shoelace_area(points: Sequence[tuple[float, float]]) -> float:
-    """Aire d'un polygone simple via la formule du lacet.
+def _signed_shoelace_area(xs: np.ndarray, ys: np.ndarray) -> float:
+    """Aire signée d'un polygone simple via la formule du lacet.
 
     Formule (points (x_i, y_i) fermés):
-        A = 1/2 * |Σ (x_i*y_{i+1} - x_{i+1}*y_i)|
+        A = 1/2 * Σ (x_i*y_{i+1} - x_{i+1}*y_i)
 
+    Positive si le contour est parcouru dans le sens CCW, négative en CW.
     On tolère que le premier point ne soit pas répété à la fin.
+    Coordonnées en SoA: un tableau de X, un tableau de Y (calcul vectorisé).
     """
 
-    if len(points) < 3:
+    x = np.asarray(xs, dtype=np.float64)
+    y = np.asarray(ys, dtype=np.float64)
+    if x.ndim != 1 or x.shape != y.shape or x.size < 3:
         return 0.0
 
-    area2 = 0.0
-    for i in range(len(points)):
-        x1, y1 = points[i]
-        x2, y2 = points[(i + 1) % len(points)]
-        area2 += x1 * y2 - x2 * y1
-    return abs(area2) * 0.5
+    # Produits croisés sur des vues décalées (pas de copie type np.roll),
+    # plus le terme de fermeture (dernier -> premier point).
+    area2 = float(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1])) + (x[-1] * y[0] - x[0] * y[-1])
+    return area2 * 0.5
 
 
-def _angle_normalize(theta: float) -> float:
-    """Normalise un angle en radians dans [0, 2π)."""
+def _shoelace_area(xs: np.ndarray, ys: np.ndarray) -> float:
+    """Aire (non signée) d'un polygone simple: |_signed_shoelace_area|."""
 
-    while theta < 0:
-        theta += 2 * pi
-    while theta >= 2 * pi:
-        theta -= 2 * pi
-    return theta
+    return abs(_signed_shoelace_area(xs, ys))
 
 
 def _arc_delta_ccw(start: float, end: float) -> float:
     """Delta angulaire en sens anti-horaire dans [0, 2π]."""
 
-    start_n = _angle_normalize(start)
-    end_n = _angle_normalize(end)
-    delta = end_n - start_n
-    if delta < 0:
-        delta += 2 * pi
-    return delta
+    return (end - start) % _TWO_PI
 
 
-def _bulge_to_arc(
-    start: tuple[float, float],
-    end: tuple[float, float],
-    bulge: float,
-) -> tuple[tuple[float, float], float, float, float, int]:
-    """Convertit un segment bulgé (LWPOLYLINE) en arc géométrique.
+def _bulge_arcs(
+    x1: np.ndarray,
+    y1: np.ndarray,
+    x2: np.ndarray,
+    y2: np.ndarray,
+    bulges: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Convertit des segments bulgés (LWPOLYLINE) en arcs géométriques, vectorisé.
 
     Définitions DXF:
     - bulge = tan(θ/4) où θ est l'angle inclus de l'arc.
     - Le signe de bulge détermine le sens (bulge>0: arc CCW de start vers end).
 
-    Retour:
-    - center (cx, cy)
-    - start_angle_rad, end_angle_rad (mesurés depuis le centre)
+    Retour (un tableau par champ, un élément par segment):
+    - cx, cy: centre
     - radius
-    - direction (1=CCW, -1=CW)
+    - start_angle (rad, mesuré depuis le centre)
+    - sweep: angle balayé signé (= θ; >0 CCW, <0 CW)
+
+    Le centre est décalé du milieu de corde, le long de la normale gauche
+    (-dy, dx), de (1 - b²) / (4b): ce décalage signé place le centre du bon
+    côté y compris pour les grands arcs (|bulge| > 1, θ > 180°).
+    Les bulges doivent être non nuls et les cordes non dégénérées.
 
     Références pratiques:
     - Cette géométrie est standard AutoCAD/DXF.
     """
 
-    if bulge == 0:
-        raise ValueError('bulge must be non-zero')
-
-    x1, y1 = start
-    x2, y2 = end
-
-    chord = _distance(start, end)
-    if chord == 0:
-        raise ValueError('degenerate chord')
-
-    theta = 4.0 * atan2(bulge, 1.0)  # angle inclus (rad), signe inclus
-    direction = 1 if theta >= 0 else -1
-    theta_abs = abs(theta)
-
-    # Rayon: R = c / (2 sin(θ/2))
-    sin_half = sin(theta_abs / 2.0)
-    if sin_half == 0:
-        raise ValueError('invalid bulge angle')
-    radius = chord / (2.0 * sin_half)
-
-    # Milieu de corde
-    mx = (x1 + x2) / 2.0
-    my = (y1 + y2) / 2.0
+    dx = x2 - x1
+    dy = y2 - y1
+    k = (1.0 - bulges * bulges) / (4.0 * bulges)
+    cx = 0.5 * (x1 + x2) - dy * k
+    cy = 0.5 * (y1 + y2) + dx * k
+    # R = c / (2 sin(θ/2)) = c (1 + b²) / (4 |b|)
+    radius = np.hypot(dx, dy) * (1.0 + bulges * bulges) / (4.0 * np.abs(bulges))
+    start_angle = np.arctan2(y1 - cy, x1 - cx)
+    sweep = 4.0 * np.arctan(bulges)
+    return cx, cy, radius, start_angle, sweep
 
-    # Distance du centre au milieu de corde: h = sqrt(R^2 - (c/2)^2)
-    half = chord / 2.0
-    h_sq = max(radius * radius - half * half, 0.0)
-    h = sqrt(h_sq)
 
-    # Vecteur normal unitaire à la corde
-    dx = (x2 - x1) / chord
-    dy = (y2 - y1) / chord
-    # Pour CCW, le centre est du côté gauche de la corde (rotation +90°)
-    nx = -dy
-    ny = dx
+def _arc_max_step(
+    radius: float,
+    max_step_deg: float = _MAX_STEP_DEG,
+    max_sagitta: float | None = None,
+) -> float:
+    """Pas angulaire max (radians) entre deux points d'échantillonnage d'un arc."""
 
-    # Sens CW inverse le côté
-    side = 1.0 if direction == 1 else -1.0
-    cx = mx + side * nx * h
-    cy = my + side * ny * h
+    # Précision (ingénierie): on privilégie une contrainte d'erreur (sagitta)
+    # plutôt qu'un angle fixe.
+    # - sagitta = flèche max entre l'arc et sa corde.
+    # - Plus sagitta est petite, plus l'approximation est précise.
+    if max_sagitta is not None and max_sagitta > 0 and radius > 0:
+        # angle max par segment pour respecter la flèche: s = R(1 - cos(a/2))
+        # => cos(a/2) = 1 - s/R
+        # => a = 2 arccos(1 - s/R)
+        try:
+            from math import acos
 
-    start_angle = atan2(y1 - cy, x1 - cx)
-    end_angle = atan2(y2 - cy, x2 - cx)
+            ratio = 1.0 - (float(max_sagitta) / float(radius))
+            ratio = max(-1.0, min(1.0, ratio))
+            return max(1e-6, 2.0 * acos(ratio))
+        except Exception:
+            pass
 
-    return (cx, cy), start_angle, end_angle, radius, direction
+    if max_step_deg <= 0 or max_step_deg == _MAX_STEP_DEG:
+        return _MAX_STEP_RAD
+    return max_step_deg * _DEG2RAD
 
 
 def _sample_arc_points(
@@ -196,10 +216,10 @@ def _sample_arc_points(
     start_angle: float,
     end_angle: float,
     direction: int,
-    max_step_deg: float = 5.0,
+    max_step_deg: float = _MAX_STEP_DEG,
     max_sagitta: float | None = None,
-) -> List[tuple[float, float]]:
-    """Échantillonne un arc en une polyline (liste de points).
+) -> np.ndarray:
+    """Échantillonne un arc en une polyline (tableau (N, 2) de points).
 
     Pour la précision:
     - On contrôle l'angle max entre points (par défaut 5°).
@@ -210,319 +230,323 @@ def _sample_arc_points(
     """
 
     cx, cy = center
+    max_step = _arc_max_step(radius, max_step_deg, max_sagitta)
 
-    # Précision (ingénierie): on privilégie une contrainte d'erreur (sagitta)
-    # plutôt qu'un angle fixe.
-    # - sagitta = flèche max entre l'arc et sa corde.
-    # - Plus sagitta est petite, plus l'approximation est précise.
-    if max_sagitta is not None and max_sagitta > 0 and radius > 0:
-        # angle max par segment pour respecter la flèche: s = R(1 - cos(a/2))
-        # => cos(a/2) = 1 - s/R
-        # => a = 2 arccos(1 - s/R)
-        try:
-            from math import acos
-
-            ratio = 1.0 - (float(max_sagitta) / float(radius))
-            ratio = max(-1.0, min(1.0, ratio))
-            max_step = max(1e-6, 2.0 * acos(ratio))
-        except Exception:
-            max_step = max(1e-6, (max_step_deg if max_step_deg > 0 else 5.0) * pi / 180.0)
-    else:
-        if max_step_deg <= 0:
-            max_step_deg = 5.0
-        max_step = max_step_deg * pi / 180.0
-
+    # Échantillonnage vectorisé: un seul appel np.cos/np.sin pour tout l'arc.
     if direction == 1:
         delta = _arc_delta_ccw(start_angle, end_angle)
-        steps = max(1, int(ceil(delta / max_step)))
-        pts: List[tuple[float, float]] = []
-        for i in range(steps + 1):
-            t = start_angle + (delta * i / steps)
-            pts.append((cx + radius * cos(t), cy + radius * sin(t)))
-        return pts
-
-    # CW: on parcourt l'arc dans le sens horaire
-    delta_ccw = _arc_delta_ccw(end_angle, start_angle)
-    steps = max(1, int(ceil(delta_ccw / max_step)))
-    pts = []
-    for i in range(steps + 1):
-        t = start_angle - (delta_ccw * i / steps)
-        pts.append((cx + radius * cos(t), cy + radius * sin(t)))
-    return pts
-
-
-def _lwpolyline_length_and_points(entity) -> tuple[float, List[tuple[float, float]]]:
-    """Calcule longueur d'une LWPOLYLINE et renvoie une liste de points aplatis.
+        sign = 1.0
+    else:
+        # CW: on parcourt l'arc dans le sens horaire
+        delta = _arc_delta_ccw(end_angle, start_angle)
+        sign = -1.0
 
-    - Longueur: somme des segments droits + longueur des arcs (bulge).
-    - Points: servent au calcul d'aire (Shoelace) sur une approximation maîtrisée.
+    steps = max(1, int(ceil(delta / max_step)))
+    t = start_angle + sign * np.linspace(0.0, delta, steps + 1)
+    return np.column_stack((cx + radius * np.cos(t), cy + radius * np.sin(t)))
 
-    On récupère les points au format (x, y, bulge).
+
+def _lwpolyline_segments(entity) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Segments d'une LWPOLYLINE en SoA: (x1, y1, x2, y2, bulge), un tableau par champ.
+
+    Les sommets (x, y, bulge) sont lus d'un bloc dans un tableau (N, 3); pour une
+    polyline fermée, le dernier segment relie le dernier sommet au premier.
     """
 
-    points = list(entity.get_points('xyb'))
-    if not points:
-        return 0.0, []
+    verts = np.fromiter(entity.get_points('xyb'), dtype=np.dtype((np.float64, 3)))
+    xs = verts[:, 0]
+    ys = verts[:, 1]
+    bulges = verts[:, 2]
 
-    is_closed = bool(getattr(entity, 'closed', False))
+    if bool(getattr(entity, 'closed', False)):
+        return xs, ys, np.roll(xs, -1), np.roll(ys, -1), bulges
+    return xs[:-1], ys[:-1], xs[1:], ys[1:], bulges[:-1]
 
-    # Prépare la liste des sommets (x, y, bulge)
-    verts = [(float(x), float(y), float(b or 0.0)) for x, y, b in points]
 
-    length = 0.0
-    flat_points: List[tuple[float, float]] = [(verts[0][0], verts[0][1])]
+def _lwpolyline_length(entity) -> float:
+    """Longueur d'une LWPOLYLINE (segments droits + arcs), sans échantillonnage.
 
-    seg_count = len(verts) if is_closed else (len(verts) - 1)
+    Variante de _lwpolyline_length_and_points pour les couches linéaires: les
+    points aplatis n'y servent à rien, on ne calcule donc que R·|θ| pour les arcs.
+    """
 
-    for i in range(seg_count):
-        x1, y1, bulge = verts[i]
-        if i == len(verts) - 1:
-            x2, y2, _ = verts[0]
-        else:
-            x2, y2, _ = verts[i + 1]
+    x1, y1, x2, y2, bulges = _lwpolyline_segments(entity)
 
-        start = (x1, y1)
-        end = (x2, y2)
+    # Segments droits (et bulges sur corde nulle): une seule réduction vectorisée.
+    chords = np.hypot(x2 - x1, y2 - y1)
+    arc = (bulges != 0.0) & (chords > 0.0)
+    length = float(chords[~arc].sum())
 
-        if bulge == 0.0:
-            length += _distance(start, end)
-            flat_points.append(end)
-            continue
+    # Segments bulgés: R·|θ|, vectorisé.
+    if arc.any():
+        _cx, _cy, radius, _a0, sweep = _bulge_arcs(x1[arc], y1[arc], x2[arc], y2[arc], bulges[arc])
+        length += float(np.dot(radius, np.abs(sweep)))
+
+    return length
 
-        center, a1, a2, radius, direction = _bulge_to_arc(start, end, bulge)
-        if direction == 1:
-            delta = _arc_delta_ccw(a1, a2)
-        else:
-            delta = _arc_delta_ccw(a2, a1)
-        length += abs(delta) * radius
 
-        arc_pts = _sample_arc_points(center, radius, a1, a2, direction)
-        # Le premier point de arc_pts est start, déjà présent
-        for p in arc_pts[1:]:
-            flat_points.append(p)
+def _lwpolyline_length_and_points(
+    entity,
+    *,
+    max_sagitta: float | None = None,
+) -> tuple[float, np.ndarray, np.ndarray]:
+    """Calcule longueur d'une LWPOLYLINE et renvoie ses points aplatis (xs, ys).
 
-    return length, flat_points
+    - Longueur: somme des segments droits + longueur des arcs (bulge).
+    - Points: servent au calcul d'aire (Shoelace) sur une approximation maîtrisée;
+      renvoyés en SoA (un tableau de X, un tableau de Y), sans liste de tuples.
 
+    On récupère les points au format (x, y, bulge).
 
-def _polyline_points_2d(entity) -> list[tuple[float, float]]:
-    """Extrait des points XY d'une POLYLINE (ancienne entité DXF) en 2D.
+    Tous les points de sortie s'écrivent P = C + R·(cos t, sin t): un segment droit
+    contribue son extrémité (C = fin, R = 0), un arc ses échantillons. Une fois la
+    table des segments construite, tous les arcs de la polyline sont évalués par un
+    seul appel np.cos/np.sin.
 
-    Beaucoup de fichiers AutoCAD utilisent encore POLYLINE au lieu de LWPOLYLINE.
-    On ne gère ici que les sommets 2D (x,y).
+    max_sagitta (unités dessin): flèche max tolérée entre arc et corde. Le nombre
+    de points suit alors le rayon (peu de points sur les petits arcs, plus sur les
+    grands); sans tolérance, pas angulaire fixe de 5°.
     """
 
-    pts: list[tuple[float, float]] = []
-    try:
-        for v in entity.vertices():
-            loc = v.dxf.location
-            pts.append((float(loc.x), float(loc.y)))
-    except Exception:
-        return []
-    return pts
+    x1, y1, x2, y2, bulges = _lwpolyline_segments(entity)
+    if x1.size == 0:
+        # Aucun segment: au plus un sommet isolé.
+        return 0.0, x1.copy(), y1.copy()
+
+    if not bulges.any():
+        # Cas courant (aucun arc): les points sont les sommets, sans table de segments.
+        length = float(np.hypot(x2 - x1, y2 - y1).sum())
+        return length, np.concatenate(([x1[0]], x2)), np.concatenate(([y1[0]], y2))
+
+    # Table des segments (une entrée par segment): centre, rayon, angle de départ,
+    # pas angulaire signé, nb de points. Par défaut: segment droit.
+    seg_cx = x2.copy()
+    seg_cy = y2.copy()
+    seg_r = np.zeros_like(x1)
+    seg_a0 = np.zeros_like(x1)
+    seg_da = np.zeros_like(x1)
+    seg_n = np.ones(x1.size, dtype=np.int64)
+
+    chords = np.hypot(x2 - x1, y2 - y1)
+    arc = (bulges != 0.0) & (chords > 0.0)
+    length = float(chords[~arc].sum())
+
+    # Tous les segments bulgés d'un coup: centre, rayon, balayage, nb de pas.
+    cx, cy, radius, a0, sweep = _bulge_arcs(x1[arc], y1[arc], x2[arc], y2[arc], bulges[arc])
+    delta = np.abs(sweep)
+    length += float(np.dot(radius, delta))
+
+    if max_sagitta is None:
+        steps = np.ceil(delta * _INV_MAX_STEP)
+    else:
+        # Flèche s = R(1 - cos(a/2)) => a = 2 arccos(1 - s/R)
+        max_step = 2.0 * np.arccos(np.clip(1.0 - max_sagitta / radius, -1.0, 1.0))
+        steps = np.ceil(delta / np.maximum(max_step, 1e-6))
+    steps = np.maximum(steps, 1).astype(np.int64)
 
+    # Le point de départ de l'arc est start, déjà présent
+    seg_cx[arc] = cx
+    seg_cy[arc] = cy
+    seg_r[arc] = radius
+    seg_a0[arc] = a0
+    seg_da[arc] = sweep / steps
+    seg_n[arc] = steps
 
-def _polyline_is_closed(entity, pts: Sequence[tuple[float, float]], *, tol_units: float) -> bool:
-    """Détermine si une polyline doit être considérée fermée.
+    seg_idx = np.repeat(np.arange(x1.size), seg_n)
+    offsets = np.cumsum(seg_n) - seg_n
+    k = np.arange(seg_idx.size) - offsets[seg_idx] + 1
 
-    Cas réel:
-    - Certains DXF ont des contours "presque" fermés (dernier point proche du premier)
-      mais le flag closed n'est pas positionné.
+    r = seg_r[seg_idx]
+    t = seg_a0[seg_idx] + seg_da[seg_idx] * k
+    xs = np.concatenate(([x1[0]], seg_cx[seg_idx] + r * np.cos(t)))
+    ys = np.concatenate(([y1[0]], seg_cy[seg_idx] + r * np.sin(t)))
 
-    Règle:
-    - Si l'entité est explicitement fermée -> True.
-    - Sinon, si distance(first,last) <= tol_units -> True.
-    """
+    return length, xs, ys
 
-    try:
-        if bool(getattr(entity, 'closed', False)):
-            return True
-    except Exception:
-        pass
-    if len(pts) < 3:
-        return False
-    return _distance(pts[0], pts[-1]) <= max(0.0, float(tol_units))
 
+def _hatch_edge_path_points(edges, *, curve_sagitta_units: float | None = None) -> np.ndarray:
+    """Aplatit les arêtes LINE/ARC d'un EdgePath de HATCH en un contour (tableau (N, 2)).
 
-def _close_ring(points: Sequence[tuple[float, float]]) -> list[tuple[float, float]]:
-    if not points:
-        return []
-    pts = list(points)
-    if pts[0] != pts[-1]:
-        pts.append(pts[0])
-    return pts
+    Chaque arête est convertie en tableau de points (arcs échantillonnés en une
+    passe vectorisée); les tableaux sont ensuite concaténés en une seule
+    allocation. Le premier point d'une arête est le dernier de la précédente:
+    on ne le garde que pour la première arête.
 
+    Arcs: ezdxf stocke les angles dans le sens CCW (start -> end) et conserve
+    l'orientation dans le flag ``ccw``; une arête horaire est donc échantillonnée
+    CCW puis parcourue à l'envers.
 
-def _transform_point_2d(
-    p: tuple[float, float],
-    *,
-    insert: tuple[float, float],
-    rotation_deg: float,
-    sx: float,
-    sy: float,
-) -> tuple[float, float]:
-    """Applique une transformation 2D de bloc INSERT sur un point.
-
-    Hypothèse (pragmatique):
-    - On traite en 2D (plan XY). C'est suffisant pour des plans architecturaux.
-    - On applique: mise à l'échelle (sx,sy) -> rotation -> translation (insert).
+    Les ELLIPSE/SPLINE sont confiées à ezdxf (voir _hatch_path_points).
     """
 
-    x, y = p
-    x *= sx
-    y *= sy
+    chunks: list[np.ndarray] = []
+    for edge in edges:
+        # Le nom de classe ezdxf (LineEdge, ArcEdge, ...) est stable entre versions,
+        # contrairement à edge.type (chaîne en 0.x, EdgeType en 1.x).
+        et = type(edge).__name__
+        try:
+            if et == 'LineEdge':
+                # Vec2 ezdxf: coordonnées déjà flottantes, lues par attribut
+                # (ni float() ni protocole de séquence).
+                start, end = edge.start, edge.end
+                pts = np.array(((start.x, start.y), (end.x, end.y)), dtype=np.float64)
+            elif et == 'ArcEdge':
+                center = (edge.center.x, edge.center.y)
+                radius = float(edge.radius)
+                start = float(edge.start_angle) * _DEG2RAD
+                end = float(edge.end_angle) * _DEG2RAD
+                pts = _sample_arc_points(center, radius, start, end, 1, max_sagitta=curve_sagitta_units)
+                if not bool(getattr(edge, 'ccw', True)):
+                    pts = pts[::-1]
+            else:
+                continue
+        except Exception:
+            continue
+
+        chunks.append(pts[1:] if chunks else pts)
+
+    if not chunks:
+        return np.empty((0, 2))
+    return np.concatenate(chunks)
 
-    a = float(rotation_deg) * pi / 180.0
-    ca = cos(a)
-    sa = sin(a)
-    xr = x * ca - y * sa
-    yr = x * sa + y * ca
 
-    return (xr + insert[0], yr + insert[1])
+# Flags de boucle HATCH (groupe 92): EXTERNAL | OUTERMOST = contour extérieur.
+_HATCH_OUTER_PATH_FLAGS = 1 | 16
 
+# Tolérance d'aplatissement par défaut (unités DXF) quand l'échelle est inconnue.
+_DEFAULT_FLATTEN_DISTANCE = 0.01
 
-def _iter_entities_with_blocks(msp, doc, *, max_depth: int = 2) -> Iterable[tuple[object, str]]:
-    """Itère sur les entités du modelspace + entités contenues dans des INSERT.
 
-    Pourquoi:
-    - Beaucoup de DXF encapsulent les murs/dalles dans des blocs (INSERT).
-      Si on ne "déplie" pas les blocs, on voit des INSERT mais pas la géométrie.
+def _hatch_path_points(path, *, curve_sagitta_units: float | None = None) -> np.ndarray:
+    """Contour aplati (tableau (N, 2)) d'une boucle de HATCH.
 
-    Sortie:
-    - tuples (entity_like, effective_layer_name)
+    - PolylinePath sans bulge / EdgePath LINE+ARC: lecture directe, vectorisée.
+    - PolylinePath avec bulges / EdgePath avec ELLIPSE ou SPLINE: aplatissement
+      natif ezdxf (``ezdxf.path``), qui suit la vraie courbe au lieu de
+      relier les points de contrôle.
     """
 
-    def walk(entity, depth: int) -> Iterable[tuple[object, str]]:
-        layer_name = getattr(entity.dxf, 'layer', None)
-        etype = entity.dxftype()
-        if etype != 'INSERT':
-            yield (entity, layer_name)
-            return
+    kind = type(path).__name__
+    if kind == 'PolylinePath':
+        verts = path.vertices
+        if not verts:
+            return np.empty((0, 2))
+        # (x, y, bulge) lus d'un bloc dans un tableau (N, 3).
+        xyb = np.fromiter(
+            ((v[0], v[1], v[2] if len(v) > 2 else 0.0) for v in verts),
+            dtype=np.dtype((np.float64, 3)),
+            count=len(verts),
+        )
+        if not xyb[:, 2].any():
+            return xyb[:, :2]
+    elif kind == 'EdgePath':
+        edges = path.edges
+        if all(type(e).__name__ in ('LineEdge', 'ArcEdge') for e in edges):
+            return _hatch_edge_path_points(edges, curve_sagitta_units=curve_sagitta_units)
+    else:
+        return np.empty((0, 2))
 
-        # INSERT: on émet aussi l'INSERT lui-même (utile pour comptage),
-        # puis on parcourt le contenu du block.
-        yield (entity, layer_name)
+    from ezdxf import path as ezpath
 
-        if depth >= max_depth:
-            return
+    distance = curve_sagitta_units or _DEFAULT_FLATTEN_DISTANCE
+    return np.array([(v.x, v.y) for v in ezpath.from_hatch_boundary_path(path).flattening(distance)])
 
-        try:
-            block_name = entity.dxf.name
-            block = doc.blocks.get(block_name)
-        except Exception:
-            return
 
-        try:
-            ins_pt = entity.dxf.insert
-            insert_xy = (float(ins_pt.x), float(ins_pt.y))
-        except Exception:
-            insert_xy = (0.0, 0.0)
+# En dessous de cette surface d'encombrement, un HATCH est un symbole (remplissage
+# de repère, flèche, ...) et non une surface de métré: on ne l'aplatit pas.
+_MIN_HATCH_AREA_M2 = 1e-4
 
-        rot = float(getattr(entity.dxf, 'rotation', 0.0) or 0.0)
-        sx = float(getattr(entity.dxf, 'xscale', 1.0) or 1.0)
-        sy = float(getattr(entity.dxf, 'yscale', 1.0) or 1.0)
 
-        for child in block:
-            ctype = child.dxftype()
-            child_layer = getattr(child.dxf, 'layer', None)
-            eff_layer = child_layer or layer_name
+def _hatch_bbox_area_units(paths) -> float | None:
+    """Surface (unités²) d'un encombrement majorant toutes les boucles d'un HATCH.
 
-            if ctype == 'INSERT':
-                # INSERT imbriqué: on garde les transforms du child (pragmatique)
-                # mais on applique au moins la visite récursive.
-                yield from walk(child, depth + 1)
-                continue
+    Calcul bon marché, sans échantillonnage: sommets des polylines, extrémités
+    des LINE, centre ± rayon des ARC/ELLIPSE, points de contrôle des SPLINE
+    (enveloppe convexe). None si une boucle ne se borne pas simplement
+    (polyline bulgée, SPLINE sans points de contrôle, arête inconnue).
+    """
 
-            # On wrappe l'entité "comme si" elle était en world coords.
-            # Pour la robustesse, on transforme seulement les types supportés.
-            try:
-                if ctype == 'LINE':
-                    s = (float(child.dxf.start.x), float(child.dxf.start.y))
-                    e = (float(child.dxf.end.x), float(child.dxf.end.y))
-                    ws = _transform_point_2d(s, insert=insert_xy, rotation_deg=rot, sx=sx, sy=sy)
-                    we = _transform_point_2d(e, insert=insert_xy, rotation_deg=rot, sx=sx, sy=sy)
-
-                    class _LineLike:
-                        def __init__(self, start, end, layer):
-                            self._start = start
-                            self._end = end
-                            self.dxf = type('dxf', (), {})()
-                            self.dxf.layer = layer
-                            self.dxf.start = type('p', (), {'x': start[0], 'y': start[1]})()
-                            self.dxf.end = type('p', (), {'x': end[0], 'y': end[1]})()
-
-                        def dxftype(self):
-                            return 'LINE'
-
-                    yield (_LineLike(ws, we, eff_layer), eff_layer)
-                    continue
+    xs: list[float] = []
+    ys: list[float] = []
+    for path in paths:
+        kind = type(path).__name__
+        if kind == 'PolylinePath':
+            for v in path.vertices:
+                if len(v) > 2 and v[2]:
+                    return None
+                xs.append(v[0])
+                ys.append(v[1])
+        elif kind == 'EdgePath':
+            for edge in path.edges:
+                et = type(edge).__name__
+                if et == 'LineEdge':
+                    xs += (edge.start[0], edge.end[0])
+                    ys += (edge.start[1], edge.end[1])
+                elif et in ('ArcEdge', 'EllipseEdge'):
+                    r = edge.radius if et == 'ArcEdge' else hypot(edge.major_axis[0], edge.major_axis[1])
+                    xs += (edge.center[0] - r, edge.center[0] + r)
+                    ys += (edge.center[1] - r, edge.center[1] + r)
+                elif et == 'SplineEdge' and len(edge.control_points):
+                    for v in edge.control_points:
+                        xs.append(v[0])
+                        ys.append(v[1])
+                else:
+                    return None
+        else:
+            return None
 
-                if ctype == 'LWPOLYLINE':
-                    raw = list(child.get_points('xyb'))
-
-                    class _LWLike:
-                        def __init__(self, pts, closed, layer):
-                            self._pts = pts
-                            self.closed = closed
-                            self.dxf = type('dxf', (), {})()
-                            self.dxf.layer = layer
-
-                        def dxftype(self):
-                            return 'LWPOLYLINE'
-
-                        def get_points(self, fmt):
-                            return self._pts
-
-                    # Transforme chaque point; on garde bulge tel quel (arc intrinsèque)
-                    # NB: en cas de scale non uniforme, l'arc n'est plus un cercle.
-                    # Ici on accepte une approximation via échantillonnage dans _lwpolyline...
-                    tpts = []
-                    for x, y, b in raw:
-                        tx, ty = _transform_point_2d((float(x), float(y)), insert=insert_xy, rotation_deg=rot, sx=sx, sy=sy)
-                        tpts.append((tx, ty, float(b or 0.0)))
-                    yield (_LWLike(tpts, bool(getattr(child, 'closed', False)), eff_layer), eff_layer)
-                    continue
+    if not xs:
+        return 0.0
+    return (max(xs) - min(xs)) * (max(ys) - min(ys))
 
-                if ctype == 'ARC':
-                    # Si scale non uniforme, on échantillonne l'arc comme polyline.
-                    center = (float(child.dxf.center.x), float(child.dxf.center.y))
-                    radius = float(child.dxf.radius)
-                    a1 = float(child.dxf.start_angle) * pi / 180.0
-                    a2 = float(child.dxf.end_angle) * pi / 180.0
-
-                    pts = _sample_arc_points(center, radius, a1, a2, 1)
-                    tpts = [
-                        _transform_point_2d(p, insert=insert_xy, rotation_deg=rot, sx=sx, sy=sy)
-                        for p in pts
-                    ]
-
-                    class _PolyAsLW:
-                        def __init__(self, pts, layer):
-                            self._pts = [(p[0], p[1], 0.0) for p in pts]
-                            self.closed = False
-                            self.dxf = type('dxf', (), {})()
-                            self.dxf.layer = layer
-
-                        def dxftype(self):
-                            return 'LWPOLYLINE'
-
-                        def get_points(self, fmt):
-                            return self._pts
-
-                    yield (_PolyAsLW(tpts, eff_layer), eff_layer)
-                    continue
 
-            except Exception:
-                # Si transformation échoue, on ignore l'entité du bloc.
-                continue
+def _polyline_points_2d(entity) -> tuple[np.ndarray, np.ndarray]:
+    """Extrait les points XY d'une POLYLINE (ancienne entité DXF) en 2D (xs, ys).
+
+    Beaucoup de fichiers AutoCAD utilisent encore POLYLINE au lieu de LWPOLYLINE.
+    On ne gère ici que les sommets 2D (x,y).
+    """
+
+    try:
+        xy = np.array(
+            [(loc.x, loc.y) for loc in (v.dxf.location for v in entity.vertices())],
+            dtype=np.float64,
+        ).reshape(-1, 2)
+    except Exception:
+        return np.empty(0), np.empty(0)
+    return xy[:, 0], xy[:, 1]
 
-    for ent in msp:
-        yield from walk(ent, 0)
+
+def _polyline_is_closed(entity, xs: np.ndarray, ys: np.ndarray, *, tol_units: float) -> bool:
+    """Détermine si une polyline doit être considérée fermée.
+
+    Cas réel:
+    - Certains DXF ont des contours "presque" fermés (dernier point proche du premier)
+      mais le flag closed n'est pas positionné.
+
+    Règle:
+    - Si l'entité est explicitement fermée -> True.
+    - Sinon, si distance(first,last) <= tol_units -> True.
+    """
+
+    try:
+        if bool(getattr(entity, 'closed', False)):
+            return True
+    except Exception:
+        pass
+    if len(xs) < 3:
+        return False
+    # Comparaison des carrés: pas de racine carrée.
+    dx = float(xs[-1] - xs[0])
+    dy = float(ys[-1] - ys[0])
+    tol = max(0.0, float(tol_units))
+    return dx * dx + dy * dy <= tol * tol
 
 
 def _line_length(entity) -> float:
-    start = (float(entity.dxf.start.x), float(entity.dxf.start.y))
-    end = (float(entity.dxf.end.x), float(entity.dxf.end.y))
-    return _distance(start, end)
+    start = entity.dxf.start
+    end = entity.dxf.end
+    return hypot(float(end.x) - float(start.x), float(end.y) - float(start.y))
 
 
 def _arc_length(entity) -> float:
@@ -534,11 +558,10 @@ def _arc_length(entity) -> float:
     DXF: start_angle et end_angle sont en degrés.
     """
 
-    radius = float(entity.dxf.radius)
-    a1 = float(entity.dxf.start_angle) * pi / 180.0
-    a2 = float(entity.dxf.end_angle) * pi / 180.0
-    delta = _arc_delta_ccw(a1, a2)
-    return radius * delta
+    dxf = entity.dxf
+    # Balayage CCW en degrés dans [0, 360), converti une seule fois en radians.
+    delta_deg = (float(dxf.end_angle) - float(dxf.start_angle)) % 360.0
+    return float(dxf.radius) * delta_deg * _DEG2RAD
 
 
 class DXFProcessor:
@@ -549,8 +572,22 @@ class DXFProcessor:
     surface_layers = ('DALLES', 'CHAPE', 'CARRELAGE')
     unit_layers = ('POTEAUX', 'MENUISERIES', 'SANITAIRES')
 
+    # Catégorie canonique -> famille de traitement (un seul lookup par entité).
+    category_kinds: dict[str, str] = {
+        **dict.fromkeys(linear_layers, 'linear'),
+        **dict.fromkeys(surface_layers, 'surface'),
+        **dict.fromkeys(unit_layers, 'unit'),
+    }
+
+    # Types d'entités exploités par le métré (les autres sont ignorés d'emblée).
+    supported_types = ('LINE', 'ARC', 'LWPOLYLINE', 'POLYLINE', 'HATCH', 'INSERT')
+
     def __init__(self) -> None:
         self.diagnostics: list[TakeoffDiagnostic] = []
+        # Surface d'ouverture (largeur en unités dessin x hauteur) par définition de
+        # bloc, indexée par (document, nom de bloc): les noms ne sont uniques que
+        # dans un même DXF.
+        self._opening_area_cache: dict[tuple[int, str], float] = {}
 
     def extract_data(
         self,
@@ -572,6 +609,7 @@ class DXFProcessor:
         """
 
         self.diagnostics = []
+        self._opening_area_cache = {}
 
         try:
             import ezdxf
@@ -608,9 +646,14 @@ class DXFProcessor:
         except Exception:
             pass
 
+        # Facteurs de conversion constants pour tout le fichier:
+        # longueurs (unités -> m) et aires (unités² -> m²).
+        sf = float(scale_factor)
+        sf2 = sf * sf
+
         lengths_m: dict[str, float] = {layer: 0.0 for layer in self.linear_layers}
         areas_m2: dict[str, float] = {layer: 0.0 for layer in self.surface_layers}
-        blocks_count: dict[tuple[str, str], int] = {}
+        blocks_count: defaultdict[tuple[str, str], int] = defaultdict(int)
 
         # Pour la déduction des ouvertures: on collecte les blocs "porte/fenêtre"
         openings_area_m2 = 0.0
@@ -618,12 +661,12 @@ class DXFProcessor:
         # Tolérance de fermeture (en unités du dessin).
         # On se donne 5 mm par défaut dans le monde réel, converti vers unités du dessin.
         # Exemple: si le DXF est en mm (scale=0.001), tol_units=5.
-        tol_units = 0.005 / float(scale_factor) if float(scale_factor) > 0 else 0.0
+        tol_units = 0.005 / sf if sf > 0 else 0.0
         tol_units = max(1e-6, min(tol_units, 100.0))
 
         # Tolérance de précision courbes (en unités du dessin):
         # 1 mm dans le monde réel (objectif "très précis" sans exploser le temps de calcul).
-        curve_sagitta_units = 0.001 / float(scale_factor) if float(scale_factor) > 0 else None
+        curve_sagitta_units = 0.001 / sf if sf > 0 else None
         if curve_sagitta_units is not None:
             curve_sagitta_units = max(1e-6, min(curve_sagitta_units, 50.0))
 
@@ -650,8 +693,11 @@ class DXFProcessor:
         # - INSERT.virtual_entities() (ezdxf) applique correctement les transformations
         #   du bloc (rotation/scale/translation) et retourne une géométrie en WCS.
         # - C'est nettement plus fiable que des transformations 2D faites à la main.
+        # - msp.query() filtre les types non exploités côté ezdxf (cotes, textes, ...).
+        supported_types = frozenset(self.supported_types)
+
         def _iter_all_entities():
-            for ent in msp:
+            for ent in msp.query(' '.join(self.supported_types)):
                 yield ent, getattr(ent.dxf, 'layer', None)
                 if ent.dxftype() == 'INSERT':
                     try:
@@ -661,36 +707,51 @@ class DXFProcessor:
                     except Exception:
                         continue
 
+        # Pré-classement des couches: (catégorie, famille) résolu une fois par couche
+        # de la table; les entités des couches sans catégorie (cotes, textes, ...)
+        # sont écartées sur une simple lecture de dict. Une couche absente de la
+        # table (toléré par le format DXF) est classée à sa première rencontre.
+        def _layer_dispatch(layer_norm: str) -> tuple[str, str] | None:
+            category = _category_of_normalized(layer_norm)
+            kind = self.category_kinds.get(category)
+            return (category, kind) if kind is not None else None
+
+        known_layers = {name: _layer_dispatch(name) for name in seen_layers}
+
         for e, eff_layer_name in _iter_all_entities():
             layer_norm = _norm_layer(eff_layer_name)
-            if layer_norm:
-                seen_layers.add(layer_norm)
 
             etype = e.dxftype()
-            category = identify_layer_category(layer_norm) or identify_layer_category(getattr(e.dxf, 'layer', None))
+            if etype not in supported_types:
+                continue
+
+            try:
+                dispatch = known_layers[layer_norm]
+            except KeyError:
+                dispatch = known_layers[layer_norm] = _layer_dispatch(layer_norm)
+            if dispatch is None:
+                continue
+            category, kind = dispatch
 
             # -----------------------------------------------------------------
             # 1) Éléments linéaires: LINE, ARC, LWPOLYLINE
             # -----------------------------------------------------------------
-            if category in self.linear_layers:
+            if kind == 'linear':
                 try:
                     if etype == 'LINE':
-                        lengths_m[category] += _line_length(e) * float(scale_factor)
+                        lengths_m[category] += _line_length(e) * sf
                     elif etype == 'ARC':
-                        lengths_m[category] += _arc_length(e) * float(scale_factor)
+                        lengths_m[category] += _arc_length(e) * sf
                     elif etype == 'LWPOLYLINE':
-                        ln, _pts = _lwpolyline_length_and_points(e)
-                        lengths_m[category] += ln * float(scale_factor)
+                        lengths_m[category] += _lwpolyline_length(e) * sf
                     elif etype == 'POLYLINE':
-                        pts = _polyline_points_2d(e)
-                        if len(pts) >= 2:
+                        xs, ys = _polyline_points_2d(e)
+                        if xs.size >= 2:
                             # Longueur = somme des segments consécutifs (et fermeture si close)
-                            ln_units = 0.0
-                            for i in range(len(pts) - 1):
-                                ln_units += _distance(pts[i], pts[i + 1])
-                            if _polyline_is_closed(e, pts, tol_units=tol_units):
-                                ln_units += _distance(pts[-1], pts[0])
-                            lengths_m[category] += ln_units * float(scale_factor)
+                            ln_units = float(np.hypot(np.diff(xs), np.diff(ys)).sum())
+                            if _polyline_is_closed(e, xs, ys, tol_units=tol_units):
+                                ln_units += hypot(float(xs[0] - xs[-1]), float(ys[0] - ys[-1]))
+                            lengths_m[category] += ln_units * sf
                 except Exception as exc:
                     self.diagnostics.append(
                         TakeoffDiagnostic('warning', f"Entité linéaire ignorée ({category}/{etype}): {exc}")
@@ -699,29 +760,28 @@ class DXFProcessor:
             # -----------------------------------------------------------------
             # 2) Éléments surfaciques: LWPOLYLINE fermée, HATCH
             # -----------------------------------------------------------------
-            if category in self.surface_layers:
+            elif kind == 'surface':
                 try:
                     if etype == 'LWPOLYLINE':
-                        _ln, pts = _lwpolyline_length_and_points(e)
+                        _ln, xs, ys = _lwpolyline_length_and_points(e, max_sagitta=curve_sagitta_units)
                         # Correction "polylines pas fermées":
                         # - Si le contour est presque fermé, on force la fermeture.
-                        if _polyline_is_closed(e, pts, tol_units=tol_units):
-                            ring = _close_ring(pts)
+                        if _polyline_is_closed(e, xs, ys, tol_units=tol_units):
+                            # Le lacet referme l'anneau implicitement (pas de copie).
                             # Conversion en m puis aire en m² => (scale)^2
-                            poly_area = _shoelace_area(ring) * (float(scale_factor) ** 2)
+                            poly_area = _shoelace_area(xs, ys) * sf2
                             areas_m2[category] += poly_area
                     elif etype == 'HATCH':
                         hatch_area = self._hatch_area_approx_m2(
                             e,
-                            scale_factor=float(scale_factor),
+                            scale_factor_sq=sf2,
                             curve_sagitta_units=curve_sagitta_units,
                         )
                         areas_m2[category] += hatch_area
                     elif etype == 'POLYLINE':
-                        pts = _polyline_points_2d(e)
-                        if _polyline_is_closed(e, pts, tol_units=tol_units):
-                            ring = _close_ring(pts)
-                            poly_area = _shoelace_area(ring) * (float(scale_factor) ** 2)
+                        xs, ys = _polyline_points_2d(e)
+                        if _polyline_is_closed(e, xs, ys, tol_units=tol_units):
+                            poly_area = _shoelace_area(xs, ys) * sf2
                             areas_m2[category] += poly_area
                 except Exception as exc:
                     self.diagnostics.append(
@@ -730,17 +790,17 @@ class DXFProcessor:
 
             # -----------------------------------------------------------------
             # 3) Éléments unitaires: INSERT (références de blocs)
+            #    Les familles sont disjointes: ici kind == 'unit'.
             # -----------------------------------------------------------------
-            if category in self.unit_layers and etype == 'INSERT':
+            elif etype == 'INSERT':
                 try:
                     name = (getattr(e.dxf, 'name', None) or '').strip()
                     if name:
-                        key = (category, name)
-                        blocks_count[key] = blocks_count.get(key, 0) + 1
+                        blocks_count[(category, name)] += 1
 
                     # Déduction d'ouvertures uniquement depuis MENUISERIES
                     if category == 'MENUISERIES' and name:
-                        openings_area_m2 += self._estimate_opening_area_m2(e, scale_factor=float(scale_factor))
+                        openings_area_m2 += self._estimate_opening_area_m2(e, scale_factor=sf)
                 except Exception as exc:
                     self.diagnostics.append(
                         TakeoffDiagnostic('warning', f"Bloc ignoré ({category}/{etype}): {exc}")
@@ -768,40 +828,29 @@ class DXFProcessor:
                 )
             )
 
-        # Assemble DataFrame
-        rows: list[dict[str, object]] = []
+        # Assemble DataFrame (colonnes parallèles: une seule copie par colonne,
+        # pas d'inférence ligne à ligne depuis des dicts).
+        designations: list[str] = []
+        quantities: list[float] = []
+        units: list[str] = []
+        categories: list[str] = []
+
+        def add_row(designation: str, quantity: float, unit: str, category: str) -> None:
+            designations.append(designation)
+            quantities.append(quantity)
+            units.append(unit)
+            categories.append(category)
 
         for layer in self.linear_layers:
             qty = lengths_m.get(layer, 0.0)
-            rows.append(
-                {
-                    'Désignation': f"{layer} — Longueur totale",
-                    'Quantité': float(qty),
-                    'Unité': 'm',
-                    'Catégorie': 'Linéaires',
-                }
-            )
+            add_row(f"{layer} — Longueur totale", float(qty), 'm', 'Linéaires')
 
         for layer in self.surface_layers:
             qty = areas_m2.get(layer, 0.0)
-            rows.append(
-                {
-                    'Désignation': f"{layer} — Surface totale",
-                    'Quantité': float(qty),
-                    'Unité': 'm²',
-                    'Catégorie': 'Surfaces',
-                }
-            )
+            add_row(f"{layer} — Surface totale", float(qty), 'm²', 'Surfaces')
 
         for (layer, name), count in sorted(blocks_count.items(), key=lambda x: (x[0][0], x[0][1])):
-            rows.append(
-                {
-                    'Désignation': f"{layer} — {name}",
-                    'Quantité': int(count),
-                    'Unité': 'U',
-                    'Catégorie': 'Unités',
-                }
-            )
+            add_row(f"{layer} — {name}", int(count), 'U', 'Unités')
 
         # Surfaces murs + déduction ouvertures
         murs_length_m = lengths_m.get('MURS', 0.0)
@@ -810,32 +859,21 @@ class DXFProcessor:
             surface_ouvertures = max(0.0, float(openings_area_m2))
             surface_murs_nette = max(0.0, surface_murs_brute - surface_ouvertures)
 
-            rows.append(
-                {
-                    'Désignation': 'MURS — Surface brute (Longueur × Hauteur)',
-                    'Quantité': float(surface_murs_brute),
-                    'Unité': 'm²',
-                    'Catégorie': 'Déductions',
-                }
-            )
-            rows.append(
-                {
-                    'Désignation': 'MENUISERIES — Ouvertures (surface estimée)',
-                    'Quantité': float(surface_ouvertures),
-                    'Unité': 'm²',
-                    'Catégorie': 'Déductions',
-                }
-            )
-            rows.append(
-                {
-                    'Désignation': 'MURS — Surface nette (brute − ouvertures)',
-                    'Quantité': float(surface_murs_nette),
-                    'Unité': 'm²',
-                    'Catégorie': 'Déductions',
-                }
-            )
-
-        df = pd.DataFrame(rows, columns=['Désignation', 'Quantité', 'Unité', 'Catégorie'])
+            add_row('MURS — Surface brute (Longueur × Hauteur)', float(surface_murs_brute), 'm²', 'Déductions')
+            add_row('MENUISERIES — Ouvertures (surface estimée)', float(surface_ouvertures), 'm²', 'Déductions')
+            add_row('MURS — Surface nette (brute − ouvertures)', float(surface_murs_nette), 'm²', 'Déductions')
+
+        # Types de colonnes explicites: pandas n'a rien à inférer (Quantité était
+        # déjà float64, les comptages de blocs y étant mêlés aux longueurs/surfaces).
+        df = pd.DataFrame(
+            {
+                'Désignation': np.asarray(designations, dtype=object),
+                'Quantité': np.asarray(quantities, dtype=np.float64),
+                'Unité': np.asarray(units, dtype=object),
+                'Catégorie': np.asarray(categories, dtype=object),
+            },
+            columns=['Désignation', 'Quantité', 'Unité', 'Catégorie'],
+        )
         return df
 
     def _estimate_opening_area_m2(self, insert_entity, *, scale_factor: float) -> float:
@@ -845,16 +883,48 @@ class DXFProcessor:
         - La largeur de l'ouverture est estimée par l'encombrement XY du bloc.
         - La hauteur d'ouverture est une hypothèse selon le type (porte/fenêtre).
 
+        Le couple (type, largeur) ne dépend que de la définition de bloc: il est
+        résolu une fois par nom de bloc (voir _opening_area_units); chaque INSERT
+        n'applique plus que son échelle.
+
         IMPORTANT:
         - En 2D, la hauteur réelle n'est généralement pas dans le DXF.
           Cette estimation reste une heuristique exploitable en métré.
         """
 
-        name = (getattr(insert_entity.dxf, 'name', None) or '').upper()
-        if not name:
+        try:
+            block_name = getattr(insert_entity.dxf, 'name', None) or ''
+            if not block_name:
+                return 0.0
+
+            doc = insert_entity.doc
+            key = (id(doc), block_name)
+            area_units = self._opening_area_cache.get(key)
+            if area_units is None:
+                area_units = self._opening_area_units(doc, block_name)
+                self._opening_area_cache[key] = area_units
+            if area_units <= 0:
+                return 0.0
+
+            # Attributs toujours définis sur un INSERT ezdxf (défaut 1 si absents du
+            # fichier): lecture directe, un facteur nul est traité comme 1.
+            dxf = insert_entity.dxf
+            scale_xy = max(abs(dxf.xscale or 1.0), abs(dxf.yscale or 1.0))
+
+            return max(0.0, area_units * scale_xy * scale_factor)
+        except Exception:
             return 0.0
 
+    @classmethod
+    def _opening_area_units(cls, doc, block_name: str) -> float:
+        """Surface d'ouverture d'une définition de bloc, par unité d'échelle.
+
+        Largeur du bloc (unités dessin) x hauteur standard (m); 0 si le bloc n'est
+        ni une porte ni une fenêtre, ou s'il est introuvable (bloc externe, proxy, ...).
+        """
+
         # Détection heuristique
+        name = block_name.upper()
         is_door = any(k in name for k in ('PORTE', 'DOOR'))
         is_window = any(k in name for k in ('FEN', 'WINDOW', 'VITR'))
         if not (is_door or is_window):
@@ -863,69 +933,34 @@ class DXFProcessor:
         # Hauteurs standard (paramétrables plus tard si besoin)
         opening_height_m = 2.10 if is_door else 1.20
 
-        width_m = self._estimate_block_width_m(insert_entity, scale_factor=scale_factor)
-        if width_m <= 0:
+        try:
+            width_units = cls._block_width_units(doc.blocks.get(block_name))
+        except Exception:
             return 0.0
+        return max(0.0, width_units) * opening_height_m
 
-        return max(0.0, width_m * opening_height_m)
-
-    def _estimate_block_width_m(self, insert_entity, *, scale_factor: float) -> float:
-        """Estime la largeur d'un bloc en mètres.
-
-        Méthode:
-        - On récupère le block definition et son bounding box 2D si possible.
-        - On applique les facteurs d'échelle de l'INSERT.
+    @staticmethod
+    def _block_width_units(block) -> float:
+        """Largeur d'une définition de bloc (unités dessin), via son bbox 2D local.
 
-        Si impossible (bloc externe, proxy, etc.), on retourne 0.
+        ezdxf.bbox gère tous les types d'entités (arcs de débattement de porte,
+        polylignes bulgées, INSERT imbriqués, ...), pas seulement LINE/LWPOLYLINE.
         """
 
-        try:
-            doc = insert_entity.doc
-            block_name = insert_entity.dxf.name
-            block = doc.blocks.get(block_name)
-
-            # Approximation: bbox des entités du bloc en coordonnées locales
-            minx = miny = float('inf')
-            maxx = maxy = float('-inf')
-            found = False
-
-            for ent in block:
-                et = ent.dxftype()
-                if et == 'LINE':
-                    pts = [
-                        (float(ent.dxf.start.x), float(ent.dxf.start.y)),
-                        (float(ent.dxf.end.x), float(ent.dxf.end.y)),
-                    ]
-                elif et == 'LWPOLYLINE':
-                    pts = [(float(x), float(y)) for x, y, _b in ent.get_points('xyb')]
-                else:
-                    continue
-
-                for x, y in pts:
-                    found = True
-                    minx = min(minx, x)
-                    maxx = max(maxx, x)
-                    miny = min(miny, y)
-                    maxy = max(maxy, y)
-
-            if not found:
-                return 0.0
-
-            width_units = max(maxx - minx, maxy - miny)
-
-            sx = float(getattr(insert_entity.dxf, 'xscale', 1.0) or 1.0)
-            sy = float(getattr(insert_entity.dxf, 'yscale', 1.0) or 1.0)
-            scale_xy = max(abs(sx), abs(sy))
+        from ezdxf import bbox
 
-            return float(width_units) * scale_xy * float(scale_factor)
-        except Exception:
+        box = bbox.extents(block, fast=True)
+        if not box.has_data:
             return 0.0
 
+        size = box.size
+        return max(float(size.x), float(size.y))
+
     def _hatch_area_approx_m2(
         self,
         hatch_entity,
         *,
-        scale_factor: float,
+        scale_factor_sq: float,
         curve_sagitta_units: float | None = None,
     ) -> float:
         """Calcule une aire approximative d'un HATCH.
@@ -934,132 +969,55 @@ class DXFProcessor:
         - Peut contenir plusieurs boucles (loops): contours extérieurs + trous.
         - Les contours peuvent être décrits par polylines ou par arêtes (edges).
 
-        Implémentation (pragmatique):
-        - On gère les chemins "polyline" de manière fiable.
-        - Pour les chemins "edge", on tente LINE/ARC et on échantillonne.
-
-        Limitation:
-        - La gestion des trous dépend de l'orientation; faute d'orientation fiable
-          dans tous les DXF, on additionne les aires absolues. Pour des hachures
-          complexes avec trous, cette approximation peut sur-estimer.
+        Implémentation:
+        - Chaque boucle est aplatie par _hatch_path_points (bulges, ellipses et
+          splines via ezdxf).
+        - Trous: si les flags de boucle (EXTERNAL/OUTERMOST) distinguent
+          contours extérieurs et îlots, on soustrait les îlots des contours.
+          Sinon (flags tous identiques, fréquent selon l'export), on se fie à
+          l'orientation: somme des aires signées, en valeur absolue.
+        - Un HATCH dont l'encombrement reste sous _MIN_HATCH_AREA_M2 (symbole)
+          compte pour 0 sans être aplati.
         """
 
-        # On tente de respecter les "trous" (holes) via l'orientation.
-        # Convention fréquente: extérieur CCW (aire signée positive), trous CW.
-        # En pratique, certains DXF ne respectent pas strictement; on fait au mieux.
-        total_signed_units2 = 0.0
-
         try:
             paths = hatch_entity.paths
         except Exception:
             return 0.0
 
+        # Court-circuit: l'encombrement majore l'aire; un HATCH minuscule
+        # (symbole) est ignoré sans échantillonner ses courbes.
+        try:
+            bbox_units2 = _hatch_bbox_area_units(paths)
+        except Exception:
+            bbox_units2 = None
+        if bbox_units2 is not None and bbox_units2 * scale_factor_sq < _MIN_HATCH_AREA_M2:
+            return 0.0
+
+        total_signed_units2 = 0.0
+        outer_units2 = 0.0
+        inner_units2 = 0.0
         for p in paths:
             try:
-                # PolylinePath (souvent le cas)
-                if hasattr(p, 'vertices') and p.vertices:
-                    verts = [(float(v[0]), float(v[1])) for v in p.vertices]
-                    # Aire signée
-                    area2 = 0.0
-                    for i in range(len(verts)):
-                        x1, y1 = verts[i]
-                        x2, y2 = verts[(i + 1) % len(verts)]
-                        area2 += x1 * y2 - x2 * y1
-                    total_signed_units2 += area2 * 0.5
+                poly = _hatch_path_points(p, curve_sagitta_units=curve_sagitta_units)
+                if len(poly) < 3:
                     continue
 
-                # EdgePath
-                if hasattr(p, 'edges') and p.edges:
-                    poly: List[tuple[float, float]] = []
-                    for edge in p.edges:
-                        et = getattr(edge, 'type', None)
-                        if et == 'LineEdge':
-                            s = (float(edge.start[0]), float(edge.start[1]))
-                            e = (float(edge.end[0]), float(edge.end[1]))
-                            if not poly:
-                                poly.append(s)
-                            poly.append(e)
-                        elif et == 'ArcEdge':
-                            center = (float(edge.center[0]), float(edge.center[1]))
-                            radius = float(edge.radius)
-                            start = float(edge.start_angle) * pi / 180.0
-                            end = float(edge.end_angle) * pi / 180.0
-                            direction = 1 if bool(getattr(edge, 'ccw', True)) else -1
-                            pts = _sample_arc_points(
-                                center,
-                                radius,
-                                start,
-                                end,
-                                direction,
-                                max_sagitta=curve_sagitta_units,
-                            )
-                            if not poly:
-                                poly.append(pts[0])
-                            poly.extend(pts[1:])
-                        elif et == 'EllipseEdge':
-                            # Approximation par échantillonnage.
-                            # L'ellipse est définie par centre + axe majeur + ratio.
-                            try:
-                                center = (float(edge.center[0]), float(edge.center[1]))
-                                major = (float(edge.major_axis[0]), float(edge.major_axis[1]))
-                                ratio = float(edge.ratio)
-                                start = float(edge.start_angle) * pi / 180.0
-                                end = float(edge.end_angle) * pi / 180.0
-                                # Pas angulaire plus fin car ellipse peut être "serrée".
-                                steps = 180
-                                if curve_sagitta_units is not None:
-                                    steps = 360
-
-                                # Parcours CCW par défaut.
-                                delta = _arc_delta_ccw(start, end)
-                                for i in range(steps + 1):
-                                    t = start + (delta * i / steps)
-                                    # Paramétrisation: P = C + major*cos(t) + minor*sin(t)
-                                    # minor est major tourné et réduit par ratio.
-                                    mx, my = major
-                                    # vecteur minor (rotation +90°)
-                                    nx, ny = (-my * ratio, mx * ratio)
-                                    x = center[0] + mx * cos(t) + nx * sin(t)
-                                    y = center[1] + my * cos(t) + ny * sin(t)
-                                    if not poly:
-                                        poly.append((x, y))
-                                    else:
-                                        poly.append((x, y))
-                            except Exception:
-                                continue
-                        elif et == 'SplineEdge':
-                            # Approximation: on utilise les points de contrôle / fit points si disponibles.
-                            try:
-                                pts = []
-                                if getattr(edge, 'fit_points', None):
-                                    pts = [(float(x), float(y)) for x, y in edge.fit_points]
-                                elif getattr(edge, 'control_points', None):
-                                    pts = [(float(x), float(y)) for x, y in edge.control_points]
-                                if pts:
-                                    if not poly:
-                                        poly.append(pts[0])
-                                    poly.extend(pts[1:])
-                            except Exception:
-                                continue
-                        else:
-                            # SplineEdge, EllipseEdge, etc. ignorés
-                            continue
-
-                    # Aire signée
-                    if len(poly) >= 3:
-                        area2 = 0.0
-                        for i in range(len(poly)):
-                            x1, y1 = poly[i]
-                            x2, y2 = poly[(i + 1) % len(poly)]
-                            area2 += x1 * y2 - x2 * y1
-                        total_signed_units2 += area2 * 0.5
+                # Aire signée (vectorisée sur le contour aplati)
+                area = _signed_shoelace_area(poly[:, 0], poly[:, 1])
             except Exception:
                 continue
 
+            total_signed_units2 += area
+            if int(getattr(p, 'path_type_flags', 0)) & _HATCH_OUTER_PATH_FLAGS:
+                outer_units2 += abs(area)
+            else:
+                inner_units2 += abs(area)
+
+        if outer_units2 > 0.0 and inner_units2 > 0.0:
+            units2 = max(0.0, outer_units2 - inner_units2)
+        else:
+            units2 = abs(total_signed_units2)
+
         # Conversion unités^2 -> m^2
-        signed_m2 = float(total_signed_units2) * (float(scale_factor) ** 2)
-        # Si l'orientation n'est pas fiable, signed_m2 peut être "absurde".
-        # On sécurise avec valeur absolue si besoin.
-        if signed_m2 < 0:
-            signed_m2 = abs(signed_m2)
-        return signed_m2
+        return float(units2) * scale_factor_sq
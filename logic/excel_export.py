@@ -10,14 +10,29 @@ Entrées:
 
 from __future__ import annotations
 
+import warnings
 from datetime import datetime
 from io import BytesIO
-from typing import Any, Iterable
+from typing import Any
 
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
 from openpyxl.utils import get_column_letter
-from openpyxl.worksheet.table import Table, TableStyleInfo
+from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
+
+
+# Styles partagés (objets immuables): créés une fois au chargement du module et
+# affectés par référence à chaque cellule.
+_TITLE_FONT = Font(bold=True, size=14)
+_TITLE_ALIGN = Alignment(horizontal='left', vertical='center')
+_HEADER_FONT = Font(bold=True, color='FFFFFF')
+_HEADER_FILL = PatternFill('solid', fgColor='1F2937')  # gris foncé
+_HEADER_ALIGN = Alignment(horizontal='center', vertical='center', wrap_text=True)
+_ALIGN_RIGHT = Alignment(horizontal='right', vertical='center')
+_ALIGN_LEFT_WRAP = Alignment(horizontal='left', vertical='center', wrap_text=True)
+_THIN = Side(style='thin', color='D1D5DB')
+_BORDER = Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN)
 
 
 def build_takeoff_excel_bytes(
@@ -26,60 +41,61 @@ def build_takeoff_excel_bytes(
     meta: dict[str, Any] | None = None,
     title: str = 'CivilQuant Pro — Métré DXF',
 ) -> BytesIO:
-    """Construit un fichier Excel en mémoire."""
+    """Construit un fichier Excel en mémoire.
+
+    Classeur en mode write_only: chaque ligne est sérialisée en XML dès son
+    ajout (ws.append), sans garder un objet Cell par case en mémoire.
+    """
 
     meta = dict(meta or {})
 
-    wb = Workbook()
-    ws = wb.active
-    ws.title = 'Métré'
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Métré')
 
     headers = ['Désignation', 'Quantité', 'Unité', 'Catégorie']
-
-    # Titre
-    ws['A1'] = title
-    ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=len(headers))
-    ws['A1'].font = Font(bold=True, size=14)
-    ws['A1'].alignment = Alignment(horizontal='left', vertical='center')
-    ws.row_dimensions[1].height = 24
-
-    # En-têtes
     header_row = 3
-    for col, h in enumerate(headers, start=1):
-        cell = ws.cell(row=header_row, column=col, value=h)
-        cell.font = Font(bold=True, color='FFFFFF')
-        cell.fill = PatternFill('solid', fgColor='1F2937')  # gris foncé
-        cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-
-    # Données
     start_data_row = header_row + 1
-    for i, r in enumerate(rows):
-        row_idx = start_data_row + i
-        ws.cell(row=row_idx, column=1, value=str(r.get('Désignation', '') or ''))
-
-        qty = r.get('Quantité', None)
-        qty_cell = ws.cell(row=row_idx, column=2, value=qty)
-
-        unit = str(r.get('Unité', '') or '')
-        ws.cell(row=row_idx, column=3, value=unit)
-        ws.cell(row=row_idx, column=4, value=str(r.get('Catégorie', '') or ''))
+    last_row = start_data_row + max(len(rows) - 1, 0)
 
-        # Formats numériques selon unité
-        if isinstance(qty, (int, float)):
-            if unit == 'm':
-                qty_cell.number_format = '0.000'
-            elif unit in {'m²', 'm2'}:
-                qty_cell.number_format = '0.00'
-            else:
-                # unités / divers
-                qty_cell.number_format = '0'
+    def styled(
+        value: Any,
+        *,
+        alignment: Alignment,
+        font: Font | None = None,
+        fill: PatternFill | None = None,
+        number_format: str | None = None,
+    ) -> WriteOnlyCell:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.alignment = alignment
+        cell.border = _BORDER
+        if font is not None:
+            cell.font = font
+        if fill is not None:
+            cell.fill = fill
+        if number_format is not None:
+            cell.number_format = number_format
+        return cell
+
+    # En write_only, la mise en page (largeurs, volet figé, fusion, tableau)
+    # est posée avant la première ligne: elle précède les données dans le XML.
+    col_widths = {
+        1: 55,
+        2: 14,
+        3: 10,
+        4: 18,
+    }
+    for col, w in col_widths.items():
+        ws.column_dimensions[get_column_letter(col)].width = w
 
-    last_row = start_data_row + max(len(rows) - 1, 0)
+    ws.freeze_panes = f"A{start_data_row}"
+    ws.merged_cells.add(f"A1:{get_column_letter(len(headers))}1")
 
     # Style tableau
     if rows:
         table_ref = f"A{header_row}:D{last_row}"
         table = Table(displayName='TakeoffTable', ref=table_ref)
+        # write_only: pas de cellules à relire, les colonnes sont déclarées ici.
+        table.tableColumns = [TableColumn(id=i, name=h) for i, h in enumerate(headers, start=1)]
         style = TableStyleInfo(
             name='TableStyleMedium9',
             showFirstColumn=False,
@@ -88,48 +104,60 @@ def build_takeoff_excel_bytes(
             showColumnStripes=False,
         )
         table.tableStyleInfo = style
-        ws.add_table(table)
+        with warnings.catch_warnings():
+            # Avertissement systématique d'openpyxl en write_only, même quand
+            # les colonnes sont fournies (ci-dessus).
+            warnings.simplefilter('ignore', UserWarning)
+            ws.add_table(table)
 
-    # Largeurs colonnes
-    col_widths = {
-        1: 55,
-        2: 14,
-        3: 10,
-        4: 18,
-    }
-    for col, w in col_widths.items():
-        ws.column_dimensions[get_column_letter(col)].width = w
+    # Titre
+    title_cell = WriteOnlyCell(ws, value=title)
+    title_cell.font = _TITLE_FONT
+    title_cell.alignment = _TITLE_ALIGN
+    ws.row_dimensions[1].height = 24
+    ws.append([title_cell])
+    ws.append([])
 
-    # Bordures et alignements
-    thin = Side(style='thin', color='D1D5DB')
-    border = Border(left=thin, right=thin, top=thin, bottom=thin)
-
-    for row in ws.iter_rows(min_row=header_row, max_row=max(last_row, header_row), min_col=1, max_col=4):
-        for cell in row:
-            cell.border = border
-            if cell.row == header_row:
-                continue
-            if cell.column == 2:
-                cell.alignment = Alignment(horizontal='right', vertical='center')
-            else:
-                cell.alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
+    # En-têtes
+    ws.append(
+        [styled(h, alignment=_HEADER_ALIGN, font=_HEADER_FONT, fill=_HEADER_FILL) for h in headers]
+    )
 
-    ws.freeze_panes = f"A{start_data_row}"
+    # Données
+    for r in rows:
+        qty = r.get('Quantité', None)
+        unit = str(r.get('Unité', '') or '')
+
+        # Formats numériques selon unité
+        number_format = None
+        if isinstance(qty, (int, float)):
+            if unit == 'm':
+                number_format = '0.000'
+            elif unit in {'m²', 'm2'}:
+                number_format = '0.00'
+            else:
+                # unités / divers
+                number_format = '0'
+
+        ws.append(
+            [
+                styled(str(r.get('Désignation', '') or ''), alignment=_ALIGN_LEFT_WRAP),
+                styled(qty, alignment=_ALIGN_RIGHT, number_format=number_format),
+                styled(unit, alignment=_ALIGN_LEFT_WRAP),
+                styled(str(r.get('Catégorie', '') or ''), alignment=_ALIGN_LEFT_WRAP),
+            ]
+        )
 
     # Feuille meta
     meta_ws = wb.create_sheet('Meta')
-    meta_ws['A1'] = 'Généré le'
-    meta_ws['B1'] = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%SZ')
-
-    row = 3
-    for k in sorted(meta.keys()):
-        meta_ws.cell(row=row, column=1, value=str(k))
-        meta_ws.cell(row=row, column=2, value=str(meta.get(k)))
-        row += 1
-
     meta_ws.column_dimensions['A'].width = 28
     meta_ws.column_dimensions['B'].width = 60
 
+    meta_ws.append(['Généré le', datetime.utcnow().strftime('%Y-%m-%d %H:%M:%SZ')])
+    meta_ws.append([])
+    for k in sorted(meta.keys()):
+        meta_ws.append([str(k), str(meta.get(k))])
+
     bio = BytesIO()
     wb.save(bio)
     bio.seek(0)
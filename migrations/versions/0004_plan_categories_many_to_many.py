@@ -73,19 +73,34 @@ def downgrade():
         with op.batch_alter_table('house_plans') as batch_op:
             batch_op.add_column(sa.Column('category_id', sa.Integer(), sa.ForeignKey('categories.id')))
 
-    # Best-effort restore: pick the first category per plan.
-    op.execute(
-        """
-        UPDATE house_plans
-        SET category_id = (
-            SELECT category_id
-            FROM house_plan_categories
-            WHERE house_plan_categories.plan_id = house_plans.id
-            ORDER BY category_id ASC
-            LIMIT 1
+    # Best-effort restore: pick the first category per plan (NULL when none).
+    # MIN() per plan replaces ORDER BY ... LIMIT 1 and reads straight from the
+    # plan_id index; PostgreSQL aggregates every plan in one grouped pass.
+    if bind.dialect.name == 'postgresql':
+        op.execute(
+            """
+            UPDATE house_plans AS hp
+            SET category_id = first_category.category_id
+            FROM house_plans AS plans
+            LEFT JOIN (
+                SELECT plan_id, MIN(category_id) AS category_id
+                FROM house_plan_categories
+                GROUP BY plan_id
+            ) AS first_category ON first_category.plan_id = plans.id
+            WHERE plans.id = hp.id
+            """
+        )
+    else:
+        op.execute(
+            """
+            UPDATE house_plans
+            SET category_id = (
+                SELECT MIN(category_id)
+                FROM house_plan_categories
+                WHERE house_plan_categories.plan_id = house_plans.id
+            )
+            """
         )
-        """
-    )
 
     # Drop association artifacts.
     try:
@@ -44,6 +44,73 @@ def _reference_code(sequence: int, created_at):
     return f"MYFREEHOUSEPLANS-{sequence:04d}/{year}"
 
 
+# Sequence padded to at least four digits, like f"{sequence:04d}" (never truncated).
+_POSTGRES_BACKFILL = sa.text(
+    """
+    UPDATE house_plans AS hp
+    SET reference_code = 'MYFREEHOUSEPLANS-'
+        || CASE WHEN seq.rn < 10000 THEN lpad(CAST(seq.rn AS TEXT), 4, '0') ELSE CAST(seq.rn AS TEXT) END
+        || '/'
+        || CAST(CAST(COALESCE(EXTRACT(YEAR FROM hp.created_at), EXTRACT(YEAR FROM now())) AS INTEGER) AS TEXT)
+    FROM (
+        SELECT id, row_number() OVER (ORDER BY created_at ASC, id ASC) AS rn
+        FROM house_plans
+    ) AS seq
+    WHERE seq.id = hp.id
+    """
+)
+
+# created_at is stored as text on SQLite; strftime() parses the ISO forms the
+# app writes and yields NULL otherwise (then the current year, as in Python).
+_SQLITE_BACKFILL = sa.text(
+    """
+    WITH seq AS (
+        SELECT id, row_number() OVER (ORDER BY created_at ASC, id ASC) AS rn
+        FROM house_plans
+    )
+    UPDATE house_plans
+    SET reference_code = 'MYFREEHOUSEPLANS-'
+        || CASE WHEN seq.rn < 10000 THEN substr('0000' || seq.rn, -4) ELSE seq.rn END
+        || '/'
+        || COALESCE(strftime('%Y', house_plans.created_at), strftime('%Y', 'now'))
+    FROM seq
+    WHERE seq.id = house_plans.id
+    """
+)
+
+
+def _backfill_reference_codes(connection):
+    """Assign MYFREEHOUSEPLANS-NNNN/YYYY codes in one statement.
+
+    PostgreSQL and SQLite >= 3.33 (UPDATE ... FROM) number the rows server-side;
+    other backends get the codes computed in Python and sent as one executemany.
+    """
+    dialect = connection.dialect.name
+    if dialect == 'postgresql':
+        connection.execute(_POSTGRES_BACKFILL)
+        return
+    if dialect == 'sqlite' and connection.dialect.dbapi.sqlite_version_info >= (3, 33, 0):
+        connection.execute(_SQLITE_BACKFILL)
+        return
+
+    plans = connection.execute(sa.text(
+        """
+        SELECT id, created_at
+        FROM house_plans
+        ORDER BY created_at ASC, id ASC
+        """
+    )).fetchall()
+    if not plans:
+        return
+    connection.execute(
+        sa.text("UPDATE house_plans SET reference_code = :code WHERE id = :plan_id"),
+        [
+            {"code": _reference_code(sequence, plan.created_at), "plan_id": plan.id}
+            for sequence, plan in enumerate(plans, start=1)
+        ],
+    )
+
+
 def upgrade():
     # Add new nullable columns with safe defaults first.
     with op.batch_alter_table('house_plans') as batch_op:
@@ -59,36 +126,20 @@ def upgrade():
     """))
 
     # Build deterministic reference codes ordered by creation.
-    plans = connection.execute(sa.text(
-        """
-        SELECT id, created_at
-        FROM house_plans
-        ORDER BY created_at ASC, id ASC
-        """
-    ))
-
-    sequence = 1
-    for plan in plans:
-        code = _reference_code(sequence, plan.created_at)
-        connection.execute(
-            sa.text("UPDATE house_plans SET reference_code = :code WHERE id = :plan_id"),
-            {"code": code, "plan_id": plan.id},
-        )
-        sequence += 1
-
-    # Reference codes must now be unique and present.
-    op.create_index('ix_house_plans_reference_code', 'house_plans', ['reference_code'], unique=True)
+    _backfill_reference_codes(connection)
 
+    # Reference codes must now be unique and present. Both NOT NULL changes share
+    # one batch, and the index is created inside it so SQLite builds it on the
+    # rebuilt table instead of copying it across the rebuild.
     with op.batch_alter_table('house_plans') as batch_op:
         batch_op.alter_column('reference_code', existing_type=sa.String(48), nullable=False)
         batch_op.alter_column('price_pack_1', existing_type=sa.Numeric(10, 2), nullable=False)
+        batch_op.create_index('ix_house_plans_reference_code', ['reference_code'], unique=True)
 
 
 def downgrade():
-    with op.batch_alter_table('house_plans') as batch_op:
-        batch_op.alter_column('price_pack_1', existing_type=sa.Numeric(10, 2), nullable=True)
-        batch_op.alter_column('reference_code', existing_type=sa.String(48), nullable=True)
-
+    # Drop the index first so a single batch (one table rebuild on SQLite)
+    # can remove both columns; relaxing NOT NULL first is moot for dropped columns.
     op.drop_index('ix_house_plans_reference_code', table_name='house_plans')
 
     with op.batch_alter_table('house_plans') as batch_op:
@@ -32,16 +32,16 @@ def upgrade():
         sa.Column('message', sa.Text(), nullable=False),
         sa.Column('inquiry_type', sa.String(length=40), nullable=False),
         sa.Column('reference_code', sa.String(length=60), nullable=True),
-        sa.Column('subscribe', sa.Boolean(), nullable=False, server_default=sa.text('false')),
+        sa.Column('subscribe', sa.Boolean(), nullable=False, server_default=sa.false()),
         sa.Column('plan_id', sa.Integer(), nullable=True),
         sa.Column('plan_snapshot', sa.String(length=255), nullable=True),
         sa.Column('attachment_path', sa.String(length=300), nullable=True),
         sa.Column('attachment_name', sa.String(length=255), nullable=True),
         sa.Column('attachment_mime', sa.String(length=120), nullable=True),
-        sa.Column('status', sa.String(length=20), nullable=False, server_default=sa.text(f"'{STATUS_DEFAULT}'")),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default=STATUS_DEFAULT),
         sa.Column('status_updated_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
         sa.Column('responded_at', sa.DateTime(), nullable=True),
-        sa.Column('email_status', sa.String(length=20), nullable=False, server_default=sa.text(f"'{EMAIL_STATUS_DEFAULT}'")),
+        sa.Column('email_status', sa.String(length=20), nullable=False, server_default=EMAIL_STATUS_DEFAULT),
         sa.Column('email_error', sa.Text(), nullable=True),
         sa.Column('admin_notes', sa.Text(), nullable=True),
         sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
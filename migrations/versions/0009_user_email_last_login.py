@@ -10,15 +10,11 @@ from alembic import op
 import sqlalchemy as sa
 
 
-def _get_columns(table_name):
-    bind = op.get_bind()
-    inspector = sa.inspect(bind)
+def _get_columns(inspector, table_name):
     return {col['name'] for col in inspector.get_columns(table_name)}
 
 
-def _get_indexes(table_name):
-    bind = op.get_bind()
-    inspector = sa.inspect(bind)
+def _get_indexes(inspector, table_name):
     return {idx['name'] for idx in inspector.get_indexes(table_name)}
 
 
@@ -30,7 +26,11 @@ depends_on = None
 
 
 def upgrade():
-    existing_columns = _get_columns('users')
+    # One inspector per step: its info_cache is shared by the calls below.
+    # Each table/kind is reflected once, so DDL in between cannot leave a
+    # stale cached answer.
+    inspector = sa.inspect(op.get_bind())
+    existing_columns = _get_columns(inspector, 'users')
 
     with op.batch_alter_table('users') as batch_op:
         if 'email' not in existing_columns:
@@ -38,16 +38,17 @@ def upgrade():
         if 'last_login' not in existing_columns:
             batch_op.add_column(sa.Column('last_login', sa.DateTime(), nullable=True))
 
-    if 'ix_users_email' not in _get_indexes('users'):
+    if 'ix_users_email' not in _get_indexes(inspector, 'users'):
         op.create_index('ix_users_email', 'users', ['email'], unique=True)
 
 
 def downgrade():
-    indexes = _get_indexes('users')
+    inspector = sa.inspect(op.get_bind())
+    indexes = _get_indexes(inspector, 'users')
     if 'ix_users_email' in indexes:
         op.drop_index('ix_users_email', table_name='users')
 
-    columns = _get_columns('users')
+    columns = _get_columns(inspector, 'users')
     with op.batch_alter_table('users') as batch_op:
         if 'last_login' in columns:
             batch_op.drop_column('last_login')
@@ -4,6 +4,19 @@ Revision ID: 0011_migrate_admin_role_data
 Revises: 0010_add_user_role
 Create Date: 2026-01-13
 
+Data migrations: prefer one set-based UPDATE (as below). When a row-wise
+transform in Python is unavoidable, stream the source rows instead of
+loading them all:
+
+    rows = bind.execution_options(stream_results=True).execute(
+        sa.text("SELECT id, is_admin FROM users")
+    )
+    for chunk in rows.partitions(1000):
+        ...  # one executemany UPDATE per chunk
+
+Memory stays bounded by the chunk size. Keep everything in the migration's
+transaction (no per-chunk commits) so a failure leaves the schema at the
+previous revision.
 """
 
 from alembic import op
@@ -31,20 +44,17 @@ def upgrade():
     if 'is_admin' not in columns or 'role' not in columns:
         return
     
-    # Update existing admins to superadmin role
-    bind.execute(
-        sa.text(
-            "UPDATE users SET role = 'superadmin' "
-            "WHERE is_admin = 1 OR is_admin = true"
-        )
-    )
-    
-    # Update non-admin users to 'user' role (should already be default, but explicit is better)
+    # One pass over users: admins become superadmin, everyone else 'user'.
+    # Existing superadmins and rows already holding their target role are
+    # skipped. A bare boolean test on is_admin works on both SQLite (0/1) and
+    # PostgreSQL (boolean).
     bind.execute(
         sa.text(
-            "UPDATE users SET role = 'user' "
-            "WHERE (is_admin = 0 OR is_admin = false OR is_admin IS NULL) "
-            "AND role != 'superadmin'"
+            "UPDATE users "
+            "SET role = CASE WHEN is_admin THEN 'superadmin' ELSE 'user' END "
+            "WHERE role IS NULL "
+            "OR (role != 'superadmin' "
+            "AND role != CASE WHEN is_admin THEN 'superadmin' ELSE 'user' END)"
         )
     )
     
@@ -8,7 +8,6 @@ Create Date: 2026-01-13
 
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy.exc import OperationalError
 
 
 # revision identifiers, used by Alembic.
@@ -18,6 +17,31 @@ branch_labels = None
 depends_on = None
 
 
+# (name, columns)
+_INDEXES = (
+    # Composite index for published plans sorted by popularity
+    ('ix_house_plans_published_views', ['is_published', 'views_count']),
+    # Composite index for published plans sorted by recency
+    ('ix_house_plans_published_created', ['is_published', 'created_at']),
+    # Index for featured plans
+    ('ix_house_plans_featured', ['is_featured']),
+)
+
+
+def _drop_invalid_index(name):
+    """Drop *name* if an interrupted CONCURRENTLY build left it INVALID.
+
+    A failed concurrent build keeps the index in the catalog, marked invalid;
+    IF NOT EXISTS would then silently accept it on the retry.
+    """
+    invalid = op.get_bind().execute(
+        sa.text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {'name': name},
+    ).scalar()
+    if invalid:
+        op.drop_index(name, postgresql_concurrently=True)
+
+
 def upgrade():
     """
     Add indexes to optimize common query patterns.
@@ -25,56 +49,38 @@ def upgrade():
     These indexes support:
     - Homepage plan listing (published + sorted by views/created_at)
     - Category filtering (published plans in category)
-    - Search queries (published plans by type)
+
+    Plan type filtering relies on ix_house_plans_plan_type, created in 0007.
+
+    On PostgreSQL the indexes are built CONCURRENTLY so writes to house_plans
+    are not blocked during the build; that is not allowed inside a
+    transaction, hence the autocommit block. IF NOT EXISTS keeps the
+    migration idempotent on every dialect; an index left INVALID by an
+    interrupted build is dropped first so the retry rebuilds it.
+
+    Databases already past this revision never run it again: the concurrent
+    build only happens on a fresh install, where house_plans is still empty.
     """
-    # Composite index for published plans sorted by popularity
-    try:
-        op.create_index(
-            'ix_house_plans_published_views',
-            'house_plans',
-            ['is_published', 'views_count'],
-            unique=False
-        )
-    except OperationalError:
-        pass
-    
-    # Composite index for published plans sorted by recency
-    try:
-        op.create_index(
-            'ix_house_plans_published_created',
-            'house_plans',
-            ['is_published', 'created_at'],
-            unique=False
-        )
-    except OperationalError:
-        pass
-    
-    # Index for plan type filtering
-    try:
-        op.create_index(
-            'ix_house_plans_plan_type',
-            'house_plans',
-            ['plan_type'],
-            unique=False
-        )
-    except OperationalError:
-        pass
-    
-    # Index for featured plans
-    try:
-        op.create_index(
-            'ix_house_plans_featured',
-            'house_plans',
-            ['is_featured'],
-            unique=False
-        )
-    except OperationalError:
-        pass
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, columns in _INDEXES:
+                _drop_invalid_index(name)
+                op.create_index(
+                    name,
+                    'house_plans',
+                    columns,
+                    unique=False,
+                    postgresql_concurrently=True,
+                    if_not_exists=True,
+                )
+        return
+
+    for name, columns in _INDEXES:
+        op.create_index(name, 'house_plans', columns, unique=False, if_not_exists=True)
 
 
 def downgrade():
     """Remove performance indexes"""
     op.drop_index('ix_house_plans_featured', table_name='house_plans')
-    op.drop_index('ix_house_plans_plan_type', table_name='house_plans')
     op.drop_index('ix_house_plans_published_created', table_name='house_plans')
     op.drop_index('ix_house_plans_published_views', table_name='house_plans')
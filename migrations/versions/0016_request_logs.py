@@ -8,6 +8,7 @@ Create Date: 2026-01-25
 
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.schema import CreateIndex, CreateTable
 
 
 # revision identifiers, used by Alembic.
@@ -17,7 +18,23 @@ branch_labels = None
 depends_on = None
 
 
-def _create_request_log_table(table_name: str, with_analyzer_fields: bool = False, with_error_fields: bool = False):
+_REQUEST_LOG_TABLES = (
+    ('visitor_logs', {}),
+    ('crawler_logs', {}),
+    ('bot_logs', {}),
+    ('api_logs', {}),
+    ('performance_logs', {}),
+    ('analyzer_logs', {'with_analyzer_fields': True}),
+    ('error_logs', {'with_error_fields': True}),
+)
+
+
+def _request_log_table(
+    metadata: sa.MetaData,
+    table_name: str,
+    with_analyzer_fields: bool = False,
+    with_error_fields: bool = False,
+) -> sa.Table:
     columns = [
         sa.Column('id', sa.Integer(), primary_key=True, nullable=False),
         sa.Column('timestamp', sa.DateTime(), nullable=False, server_default=sa.func.now()),
@@ -46,10 +63,32 @@ def _create_request_log_table(table_name: str, with_analyzer_fields: bool = Fals
             sa.Column('stacktrace', sa.Text(), nullable=True),
         ])
 
-    op.create_table(table_name, *columns)
-    op.create_index(f'ix_{table_name}_timestamp', table_name, ['timestamp'], unique=False)
-    op.create_index(f'ix_{table_name}_ip_address', table_name, ['ip_address'], unique=False)
-    op.create_index(f'ix_{table_name}_route', table_name, ['route'], unique=False)
+    table = sa.Table(table_name, metadata, *columns)
+    for column in ('timestamp', 'ip_address', 'route'):
+        sa.Index(f'ix_{table_name}_{column}', table.c[column], unique=False)
+    return table
+
+
+def _create_request_log_tables():
+    metadata = sa.MetaData()
+    statements = []
+    for table_name, options in _REQUEST_LOG_TABLES:
+        table = _request_log_table(metadata, table_name, **options)
+        statements.append(CreateTable(table, if_not_exists=True))
+        statements.extend(
+            CreateIndex(index, if_not_exists=True)
+            for index in sorted(table.indexes, key=lambda index: index.name)
+        )
+
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        # One round trip for the 7 tables and 21 indexes; IF NOT EXISTS keeps
+        # a retried upgrade from failing on objects that already exist.
+        op.execute(';\n'.join(str(stmt.compile(dialect=bind.dialect)) for stmt in statements))
+        return
+
+    for stmt in statements:
+        op.execute(stmt)
 
 
 def upgrade():
@@ -63,17 +102,11 @@ def upgrade():
     op.add_column('recent_logs', sa.Column('is_search_bot', sa.Boolean(), nullable=False, server_default=sa.false()))
     op.create_index('ix_recent_logs_session_id', 'recent_logs', ['session_id'], unique=False)
 
-    _create_request_log_table('visitor_logs')
-    _create_request_log_table('crawler_logs')
-    _create_request_log_table('bot_logs')
-    _create_request_log_table('api_logs')
-    _create_request_log_table('performance_logs')
-    _create_request_log_table('analyzer_logs', with_analyzer_fields=True)
-    _create_request_log_table('error_logs', with_error_fields=True)
+    _create_request_log_tables()
 
 
 def downgrade():
-    for table in ('error_logs', 'analyzer_logs', 'performance_logs', 'api_logs', 'bot_logs', 'crawler_logs', 'visitor_logs'):
+    for table, _ in reversed(_REQUEST_LOG_TABLES):
         op.drop_index(f'ix_{table}_route', table_name=table)
         op.drop_index(f'ix_{table}_ip_address', table_name=table)
         op.drop_index(f'ix_{table}_timestamp', table_name=table)
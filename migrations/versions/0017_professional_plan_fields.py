@@ -11,6 +11,7 @@ All existing plans will continue to work without errors.
 """
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.schema import CreateColumn
 
 
 # revision identifiers, used by Alembic.
@@ -20,54 +21,117 @@ branch_labels = None
 depends_on = None
 
 
+def _new_columns():
+    """Fresh Column objects (a Column can only be attached to one table)."""
+    return [
+        # Reference system: new public plan code (MFP-XXX format)
+        sa.Column('public_plan_code', sa.String(length=20), nullable=True),
+
+        # Marketing fields
+        sa.Column('target_buyer', sa.String(length=200), nullable=True),
+        sa.Column('budget_category', sa.String(length=100), nullable=True),
+        sa.Column('key_selling_point', sa.String(length=500), nullable=True),
+        sa.Column('problems_this_plan_solves', sa.Text(), nullable=True),
+
+        # Structured room details
+        sa.Column('living_rooms', sa.Integer(), nullable=True),
+        sa.Column('kitchens', sa.Integer(), nullable=True),
+        sa.Column('offices', sa.Integer(), nullable=True),
+        sa.Column('terraces', sa.Integer(), nullable=True),
+        sa.Column('storage_rooms', sa.Integer(), nullable=True),
+
+        # Land requirements (metric: meters)
+        sa.Column('min_plot_width', sa.Float(), nullable=True),
+        sa.Column('min_plot_length', sa.Float(), nullable=True),
+
+        # Construction details
+        sa.Column('climate_compatibility', sa.String(length=300), nullable=True),
+        sa.Column('estimated_build_time', sa.String(length=150), nullable=True),
+
+        # Cost estimates (USD)
+        sa.Column('estimated_cost_low', sa.Float(), nullable=True),
+        sa.Column('estimated_cost_high', sa.Float(), nullable=True),
+
+        # Pack descriptions (what's included in each download)
+        sa.Column('pack1_description', sa.Text(), nullable=True),
+        sa.Column('pack2_description', sa.Text(), nullable=True),
+        sa.Column('pack3_description', sa.Text(), nullable=True),
+
+        # Architectural style (new explicit field, separate from plan_type)
+        sa.Column('architectural_style', sa.String(length=150), nullable=True),
+    ]
+
+
+def _drop_invalid_index(name):
+    """Drop *name* if an interrupted CONCURRENTLY build left it INVALID.
+
+    A failed concurrent build keeps the index in the catalog, marked invalid;
+    IF NOT EXISTS would then silently accept it on the retry.
+    """
+    invalid = op.get_bind().execute(
+        sa.text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {'name': name},
+    ).scalar()
+    if invalid:
+        op.drop_index(name, postgresql_concurrently=True)
+
+
 def upgrade():
     """Add new professional fields to house_plans table.
     
     All fields are nullable to ensure compatibility with existing data.
     """
-    
-    # Reference system: new public plan code (MFP-XXX format)
-    op.add_column('house_plans', sa.Column('public_plan_code', sa.String(length=20), nullable=True))
-    op.create_index('ix_house_plans_public_plan_code', 'house_plans', ['public_plan_code'], unique=True)
-    
-    # Marketing fields
-    op.add_column('house_plans', sa.Column('target_buyer', sa.String(length=200), nullable=True))
-    op.add_column('house_plans', sa.Column('budget_category', sa.String(length=100), nullable=True))
-    op.add_column('house_plans', sa.Column('key_selling_point', sa.String(length=500), nullable=True))
-    op.add_column('house_plans', sa.Column('problems_this_plan_solves', sa.Text(), nullable=True))
-    
-    # Structured room details
-    op.add_column('house_plans', sa.Column('living_rooms', sa.Integer(), nullable=True))
-    op.add_column('house_plans', sa.Column('kitchens', sa.Integer(), nullable=True))
-    op.add_column('house_plans', sa.Column('offices', sa.Integer(), nullable=True))
-    op.add_column('house_plans', sa.Column('terraces', sa.Integer(), nullable=True))
-    op.add_column('house_plans', sa.Column('storage_rooms', sa.Integer(), nullable=True))
-    
-    # Land requirements (metric: meters)
-    op.add_column('house_plans', sa.Column('min_plot_width', sa.Float(), nullable=True))
-    op.add_column('house_plans', sa.Column('min_plot_length', sa.Float(), nullable=True))
-    
-    # Construction details
-    op.add_column('house_plans', sa.Column('climate_compatibility', sa.String(length=300), nullable=True))
-    op.add_column('house_plans', sa.Column('estimated_build_time', sa.String(length=150), nullable=True))
-    
-    # Cost estimates (USD)
-    op.add_column('house_plans', sa.Column('estimated_cost_low', sa.Float(), nullable=True))
-    op.add_column('house_plans', sa.Column('estimated_cost_high', sa.Float(), nullable=True))
-    
-    # Pack descriptions (what's included in each download)
-    op.add_column('house_plans', sa.Column('pack1_description', sa.Text(), nullable=True))
-    op.add_column('house_plans', sa.Column('pack2_description', sa.Text(), nullable=True))
-    op.add_column('house_plans', sa.Column('pack3_description', sa.Text(), nullable=True))
-    
-    # Architectural style (new explicit field, separate from plan_type)
-    op.add_column('house_plans', sa.Column('architectural_style', sa.String(length=150), nullable=True))
+
+    bind = op.get_bind()
+    columns = _new_columns()
+    if bind.dialect.name == 'postgresql':
+        # One ALTER TABLE: the lock on house_plans is taken once, and nullable
+        # columns without defaults are catalog-only changes (no table rewrite).
+        # IF NOT EXISTS: the autocommit block below commits these columns, so
+        # a retry after a failed index build must not trip over them.
+        clauses = ', '.join(
+            f'ADD COLUMN IF NOT EXISTS {CreateColumn(column).compile(dialect=bind.dialect)}'
+            for column in columns
+        )
+        op.execute(f'ALTER TABLE house_plans {clauses}')
+    else:
+        # SQLite accepts a single ADD COLUMN per ALTER TABLE.
+        for column in columns:
+            op.add_column('house_plans', column)
+
+    # Unique plan code index last, once every column is in place.
+    if bind.dialect.name == 'postgresql':
+        # CONCURRENTLY keeps house_plans readable and writable during the build;
+        # it cannot run inside the migration transaction. Databases already
+        # past this revision never rerun it, so this only matters on a fresh
+        # install.
+        with op.get_context().autocommit_block():
+            _drop_invalid_index('ix_house_plans_public_plan_code')
+            op.create_index(
+                'ix_house_plans_public_plan_code',
+                'house_plans',
+                ['public_plan_code'],
+                unique=True,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+    else:
+        op.create_index('ix_house_plans_public_plan_code', 'house_plans', ['public_plan_code'], unique=True)
 
 
 def downgrade():
     """Remove added columns (safe rollback)."""
     
-    op.drop_index('ix_house_plans_public_plan_code', table_name='house_plans')
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index(
+                'ix_house_plans_public_plan_code',
+                table_name='house_plans',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+    else:
+        op.drop_index('ix_house_plans_public_plan_code', table_name='house_plans')
     op.drop_column('house_plans', 'public_plan_code')
     
     op.drop_column('house_plans', 'target_buyer')
@@ -0,0 +1,161 @@
+"""Tune PostgreSQL indexes on deployed tables
+
+Revision ID: 0018_postgres_index_tuning
+Revises: 0017_professional_plan_fields
+Create Date: 2026-10-16
+
+These index definitions changed after their original revisions had been
+applied in production, so they are rebuilt here rather than edited into
+history. Each index is built CONCURRENTLY under a temporary name, the old one
+is dropped and the new one takes its name: reads and writes continue during
+the swap.
+
+The options involved (INCLUDE, WHERE, USING brin) are PostgreSQL-only; other
+dialects keep their existing B-tree indexes and skip the swaps. Indexes no
+query uses are dropped on every dialect.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0018_postgres_index_tuning'
+down_revision = '0017_professional_plan_fields'
+branch_labels = None
+depends_on = None
+
+
+# Request-log tables created by 0016.
+_REQUEST_LOG_TABLES = (
+    'visitor_logs',
+    'crawler_logs',
+    'bot_logs',
+    'api_logs',
+    'performance_logs',
+    'analyzer_logs',
+    'error_logs',
+)
+
+# name -> (table, (columns, options) after upgrade, (columns, options) before)
+_SWAPS = {
+    # The live dashboard counts rows and distinct IPs per traffic type since a
+    # timestamp; INCLUDE lets both be answered by an index-only scan.
+    'ix_recent_logs_type_time': (
+        'recent_logs',
+        (['traffic_type', 'timestamp'], {'postgresql_include': ['ip_address', 'id']}),
+        (['traffic_type', 'timestamp'], {}),
+    ),
+    # Email is optional: keep uniqueness, index only the accounts that have
+    # one. The full unique index guarantees there are no duplicates to clean.
+    'ix_users_email': (
+        'users',
+        (['email'], {'unique': True, 'postgresql_where': sa.text('email IS NOT NULL')}),
+        (['email'], {'unique': True}),
+    ),
+    # Append-only tables, read only by retention's DELETE ... WHERE ts < cutoff:
+    # a BRIN index keeps one summary per block range instead of one entry per
+    # row. ix_recent_logs_timestamp stays a B-tree (ORDER BY timestamp DESC).
+    'ix_visitors_created_at': (
+        'visitors',
+        (['created_at'], {'postgresql_using': 'brin'}),
+        (['created_at'], {}),
+    ),
+    **{
+        f'ix_{table}_timestamp': (
+            table,
+            (['timestamp'], {'postgresql_using': 'brin'}),
+            (['timestamp'], {}),
+        )
+        for table in _REQUEST_LOG_TABLES
+    },
+    # A boolean leading key splits house_plans in only two, so the planner
+    # often ignores these indexes. The partial form keeps only the matching
+    # plans, keyed on the sort column. The featured index serves the homepage
+    # query (is_published AND is_featured) and holds only those few plans, so
+    # writes to other plans never touch it.
+    'ix_house_plans_published_views': (
+        'house_plans',
+        (['views_count'], {'postgresql_where': sa.text('is_published')}),
+        (['is_published', 'views_count'], {}),
+    ),
+    'ix_house_plans_published_created': (
+        'house_plans',
+        (['created_at'], {'postgresql_where': sa.text('is_published')}),
+        (['is_published', 'created_at'], {}),
+    ),
+    'ix_house_plans_featured': (
+        'house_plans',
+        (['created_at'], {'postgresql_where': sa.text('is_featured AND is_published')}),
+        (['is_featured'], {}),
+    ),
+}
+
+# Unused indexes: name -> (table, columns), re-created by the downgrade.
+_DROPPED = {
+    # Leading column of ix_recent_logs_type_time, which serves the same lookups.
+    'ix_recent_logs_traffic_type': ('recent_logs', ['traffic_type']),
+    # Written on every visit, never filtered or sorted on.
+    'ix_visitors_page_visited': ('visitors', ['page_visited']),
+}
+
+
+def _drop_invalid_index(name):
+    """Drop *name* if an interrupted CONCURRENTLY build left it INVALID.
+
+    A failed concurrent build keeps the index in the catalog, marked invalid;
+    IF NOT EXISTS would then silently accept it on the retry.
+    """
+    invalid = op.get_bind().execute(
+        sa.text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {'name': name},
+    ).scalar()
+    if invalid:
+        op.drop_index(name, postgresql_concurrently=True)
+
+
+def _swap_index(name, table, columns, options):
+    """Rebuild *name* as (columns, options) without blocking writes.
+
+    Every step is idempotent, so a retry after a failure at any point
+    completes the swap.
+    """
+    temp_name = f'{name}_new'
+    _drop_invalid_index(temp_name)
+    op.create_index(
+        temp_name,
+        table,
+        columns,
+        postgresql_concurrently=True,
+        if_not_exists=True,
+        **options,
+    )
+    op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    op.execute(f'ALTER INDEX {temp_name} RENAME TO {name}')
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        for name, (table, _) in _DROPPED.items():
+            op.drop_index(name, table_name=table, if_exists=True)
+        return
+
+    with op.get_context().autocommit_block():
+        for name, (table, (columns, options), _) in _SWAPS.items():
+            _swap_index(name, table, columns, options)
+        for name, (table, _) in _DROPPED.items():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        for name, (table, columns) in _DROPPED.items():
+            op.create_index(name, table, columns, if_not_exists=True)
+        return
+
+    with op.get_context().autocommit_block():
+        for name, (table, columns) in _DROPPED.items():
+            _drop_invalid_index(name)
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        for name, (table, _, (columns, options)) in _SWAPS.items():
+            _swap_index(name, table, columns, options)
@@ -74,11 +74,19 @@ def restore_database():
             
             # Quick data integrity check
             try:
+                from sqlalchemy import func, select
                 from app.models import HousePlan, User, BlogPost
                 
-                house_plan_count = db.session.query(HousePlan).count()
-                user_count = db.session.query(User).count()
-                blog_count = db.session.query(BlogPost).count()
+                # One round trip: the three COUNT(*)s as scalar subqueries of a
+                # single SELECT (exact counts, no reltuples estimate).
+                house_plan_count, user_count, blog_count = db.session.execute(
+                    select(
+                        *(
+                            select(func.count()).select_from(model).scalar_subquery()
+                            for model in (HousePlan, User, BlogPost)
+                        )
+                    )
+                ).one()
                 
                 print(f"\n📊 Data integrity check:")
                 print(f"   🏠 House Plans: {house_plan_count}")
@@ -18,22 +18,25 @@ from sqlalchemy import inspect, text
 from wsgi import app
 from app.extensions import db
 
+_BACKFILL_BATCH_SIZE = 1000
 
-def _has_column(table_name: str, column_name: str) -> bool:
-    inspector = inspect(db.engine)
-    try:
-        cols = inspector.get_columns(table_name)
-    except Exception:
-        return False
-    return any(c.get('name') == column_name for c in cols)
 
+def _reflect_columns(*table_names: str) -> dict[str, set[str]]:
+    """Column names of the given tables that exist, reflected in one pass.
 
-def _table_exists(table_name: str) -> bool:
+    One inspector serves every lookup (its info_cache is shared), so startup
+    pays for a single table listing plus one column query per patched table.
+    """
     inspector = inspect(db.engine)
     try:
-        return table_name in set(inspector.get_table_names())
+        existing = set(inspector.get_table_names())
+        return {
+            name: {c['name'] for c in inspector.get_columns(name)}
+            for name in table_names
+            if name in existing
+        }
     except Exception:
-        return False
+        return {}
 
 
 def _ensure_columns_and_backfill() -> None:
@@ -43,9 +46,10 @@ def _ensure_columns_and_backfill() -> None:
     import app.models  # noqa: F401
 
     dialect = getattr(db.engine.dialect, 'name', '')
+    columns = _reflect_columns('users', 'house_plans')
 
     # 1) Ensure users.role exists
-    if _table_exists('users') and not _has_column('users', 'role'):
+    if 'users' in columns and 'role' not in columns['users']:
         if dialect == 'postgresql':
             db.session.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS role VARCHAR(50)"))
         else:
@@ -55,25 +59,39 @@ def _ensure_columns_and_backfill() -> None:
         db.session.execute(text("UPDATE users SET role='customer' WHERE role IS NULL OR role=''"))
 
     # 2) Ensure house_plans.created_by_id exists
-    if _table_exists('house_plans') and not _has_column('house_plans', 'created_by_id'):
+    if 'house_plans' in columns and 'created_by_id' not in columns['house_plans']:
         if dialect == 'postgresql':
             db.session.execute(text("ALTER TABLE house_plans ADD COLUMN IF NOT EXISTS created_by_id INTEGER"))
         else:
             db.session.execute(text("ALTER TABLE house_plans ADD COLUMN created_by_id INTEGER"))
         # Index helps admin/staff filtering.
         db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_house_plans_created_by_id ON house_plans (created_by_id)"))
+        columns['house_plans'].add('created_by_id')
 
     # 3) Backfill created_by_id for existing plans
-    if _table_exists('house_plans') and _has_column('house_plans', 'created_by_id'):
+    if 'created_by_id' in columns.get('house_plans', ()):
         # Prefer admin id=1 when it exists.
         admin_id = db.session.execute(text("SELECT id FROM users WHERE id=1")).scalar()
         if not admin_id:
             admin_id = db.session.execute(text("SELECT id FROM users WHERE role='superadmin' ORDER BY id ASC LIMIT 1")).scalar()
         if admin_id:
-            db.session.execute(
-                text("UPDATE house_plans SET created_by_id = :admin_id WHERE created_by_id IS NULL"),
-                {'admin_id': int(admin_id)},
+            # Batched, one commit per batch: each transaction locks at most
+            # _BACKFILL_BATCH_SIZE rows instead of the whole table. On Postgres,
+            # rows locked by a concurrent writer are skipped, not waited on.
+            lock = ' FOR UPDATE SKIP LOCKED' if dialect == 'postgresql' else ''
+            backfill = text(
+                "UPDATE house_plans SET created_by_id = :admin_id "
+                "WHERE id IN (SELECT id FROM house_plans WHERE created_by_id IS NULL "
+                f"LIMIT :batch_size{lock})"
             )
+            while True:
+                result = db.session.execute(
+                    backfill,
+                    {'admin_id': int(admin_id), 'batch_size': _BACKFILL_BATCH_SIZE},
+                )
+                db.session.commit()
+                if not result.rowcount:
+                    break
 
     db.session.commit()
 
@@ -5,13 +5,35 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from sqlalchemy import func, select
+
 from app import create_app
-from app.models import HousePlan
+from app.extensions import db
+from app.models import HousePlan, house_plan_categories
 
 app = create_app()
 
 with app.app_context():
-    plan = HousePlan.query.filter_by(slug='3-chambre').first()
+    # Only the probed columns; the category count is a correlated subquery
+    # instead of a lazy load of plan.categories.
+    category_count = (
+        select(func.count())
+        .select_from(house_plan_categories)
+        .where(house_plan_categories.c.plan_id == HousePlan.id)
+        .scalar_subquery()
+        .label('category_count')
+    )
+    plan = db.session.execute(
+        select(
+            HousePlan.id,
+            HousePlan.title,
+            HousePlan.slug,
+            HousePlan.is_published,
+            HousePlan.cover_image,
+            func.length(HousePlan.description).label('description_len'),
+            category_count,
+        ).where(HousePlan.slug == '3-chambre')
+    ).first()
     
     if plan is None:
         print("❌ Plan with slug '3-chambre' NOT FOUND")
@@ -22,15 +44,15 @@ with app.app_context():
         print(f"  Slug: {plan.slug}")
         print(f"  Is published: {plan.is_published}")
         print(f"  Has cover_image: {bool(plan.cover_image)}")
-        print(f"  Has description: {bool(plan.description)}")
+        print(f"  Has description: {bool(plan.description_len)}")
         print(f"  Has title: {bool(plan.title)}")
-        print(f"  Categories count: {len(plan.categories) if plan.categories else 0}")
+        print(f"  Categories count: {plan.category_count}")
         
         # Check for potential issues
         issues = []
         if not plan.title:
             issues.append("Missing title")
-        if not plan.description:
+        if not plan.description_len:
             issues.append("Missing description")
         if not plan.is_published:
             issues.append("Not published")
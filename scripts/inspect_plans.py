@@ -17,7 +17,10 @@ REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
+from sqlalchemy import func, select
+
 from app import create_app
+from app.extensions import db
 from app.models import HousePlan
 
 
@@ -26,10 +29,30 @@ def main() -> None:
     limit = int(os.environ.get("LIMIT", "30"))
 
     with app.app_context():
-        plans = HousePlan.query.order_by(HousePlan.id.desc()).limit(limit).all()
-        print(f"Found {len(plans)} plans (limit={limit})")
+        # Only the inspected columns (no full entity hydration); long text
+        # fields are reduced to their length in SQL.
+        rows = db.session.execute(
+            select(
+                HousePlan.id,
+                HousePlan.is_published,
+                HousePlan.slug,
+                HousePlan.reference_code,
+                HousePlan.title,
+                func.length(HousePlan.description).label("description_len"),
+                HousePlan.price,
+                HousePlan.price_pack_1,
+                HousePlan.cover_image,
+                HousePlan.main_image,
+                HousePlan.bathrooms,
+                HousePlan.total_area_sqft,
+                HousePlan.total_area_m2,
+            )
+            .order_by(HousePlan.id.desc())
+            .limit(limit)
+        ).all()
+        print(f"Found {len(rows)} plans (limit={limit})")
 
-        for plan in plans:
+        for plan in rows:
             issues: list[str] = []
             if not plan.slug:
                 issues.append("slug")
@@ -37,7 +60,7 @@ def main() -> None:
                 issues.append("reference_code")
             if not plan.title:
                 issues.append("title")
-            if not plan.description:
+            if not plan.description_len:
                 issues.append("description")
             if plan.price is None:
                 issues.append("price")
@@ -45,21 +68,15 @@ def main() -> None:
                 issues.append("price_pack_1")
 
             # Fields that commonly trigger template/python errors if invalid
-            if plan.bathrooms is not None:
-                try:
-                    float(plan.bathrooms)
-                except Exception:
-                    issues.append("bathrooms(non-numeric)")
-            if plan.total_area_sqft is not None:
-                try:
-                    float(plan.total_area_sqft)
-                except Exception:
-                    issues.append("total_area_sqft(non-numeric)")
-            if plan.total_area_m2 is not None:
+            # (SQLite will happily store text in a REAL column).
+            for field in ("bathrooms", "total_area_sqft", "total_area_m2"):
+                value = getattr(plan, field)
+                if value is None:
+                    continue
                 try:
-                    float(plan.total_area_m2)
+                    float(value)
                 except Exception:
-                    issues.append("total_area_m2(non-numeric)")
+                    issues.append(f"{field}(non-numeric)")
 
             print(
                 "id={id} published={pub} slug={slug!r} ref={ref!r} cover={cover} main={main} issues={issues}".format(
@@ -43,3 +43,183 @@ def test_dxf_processor_extracts_basic_quantities():
     # Vérifie surface brute murs: 1.0 * 3.0 = 3.0 m²
     murs_surface = df[df["Désignation"].str.contains("MURS — Surface brute")]["Quantité"].iloc[0]
     assert murs_surface == pytest.approx(3.0, abs=1e-6)
+
+
+def test_sample_arc_points_follows_direction_and_hits_endpoints():
+    from math import pi
+
+    from logic.dxf_engine import _sample_arc_points
+
+    ccw = _sample_arc_points((1.0, 2.0), 3.0, 0.0, pi / 2, 1)
+    assert ccw.shape[1] == 2
+    assert ccw[0] == pytest.approx((4.0, 2.0))
+    assert ccw[-1] == pytest.approx((1.0, 5.0))
+    radii = ((ccw[:, 0] - 1.0) ** 2 + (ccw[:, 1] - 2.0) ** 2) ** 0.5
+    assert radii == pytest.approx([3.0] * len(ccw))
+
+    # CW de 0 à π/2 => on parcourt les 3/4 du cercle
+    cw = _sample_arc_points((0.0, 0.0), 1.0, 0.0, pi / 2, -1)
+    assert cw[-1] == pytest.approx((0.0, 1.0), abs=1e-12)
+    assert cw[1][1] < 0.0
+    assert cw[:, 0].min() == pytest.approx(-1.0, abs=1e-2)
+
+
+def test_shoelace_area_is_halved_and_signed():
+    import numpy as np
+
+    from logic.dxf_engine import _shoelace_area, _signed_shoelace_area
+
+    # Carré 2x2 (CCW), premier point non répété => aire 4 (et non 8)
+    xs = np.array([0.0, 2.0, 2.0, 0.0])
+    ys = np.array([0.0, 0.0, 2.0, 2.0])
+    assert _signed_shoelace_area(xs, ys) == pytest.approx(4.0)
+    assert _signed_shoelace_area(xs[::-1], ys[::-1]) == pytest.approx(-4.0)
+    assert _shoelace_area(xs[::-1], ys[::-1]) == pytest.approx(4.0)
+
+    # Anneau explicitement fermé: même aire
+    assert _shoelace_area(np.append(xs, 0.0), np.append(ys, 0.0)) == pytest.approx(4.0)
+
+
+def test_arc_delta_ccw_wraps_negative_and_multi_turn_angles():
+    from math import pi
+
+    from logic.dxf_engine import _arc_delta_ccw
+
+    assert _arc_delta_ccw(pi / 2, 0.0) == pytest.approx(3 * pi / 2)
+    assert _arc_delta_ccw(-pi / 4, 9 * pi / 4) == pytest.approx(pi / 2)
+
+
+def test_opening_width_uses_full_block_extents():
+    ezdxf = pytest.importorskip("ezdxf")
+
+    from logic.dxf_engine import DXFProcessor
+
+    doc = ezdxf.new(setup=True)
+    msp = doc.modelspace()
+    msp.add_line((0, 0), (10000, 0), dxfattribs={"layer": "MURS"})
+
+    # Porte dessinée uniquement par son arc de débattement (rayon 900 mm)
+    door = doc.blocks.new("PORTE_90")
+    door.add_arc((0, 0), 900, 0, 90)
+    msp.add_blockref("PORTE_90", (2000, 0), dxfattribs={"layer": "MENUISERIES"})
+    msp.add_blockref("PORTE_90", (5000, 0), dxfattribs={"layer": "MENUISERIES"})
+
+    with tempfile.TemporaryDirectory() as td:
+        path = Path(td) / "doors.dxf"
+        doc.saveas(str(path))
+
+        df = DXFProcessor().extract_data(path, scale_factor=0.001, wall_height_m=2.5)
+
+    openings = df[df["Désignation"].str.contains("Ouvertures")]["Quantité"].iloc[0]
+    assert openings == pytest.approx(2 * 0.9 * 2.10, rel=1e-6)
+
+    count = df[df["Désignation"] == "MENUISERIES — PORTE_90"]["Quantité"].iloc[0]
+    assert count == 2
+
+
+def test_lwpolyline_major_arc_bulge():
+    from math import atan, sin
+
+    import numpy as np
+
+    ezdxf = pytest.importorskip("ezdxf")
+
+    from logic.dxf_engine import _lwpolyline_length, _lwpolyline_length_and_points, _shoelace_area
+
+    # bulge = 2 => angle inclus 4·atan(2) ≈ 253.7° (> 180°), corde 2 => R = 1.25
+    doc = ezdxf.new()
+    pl = doc.modelspace().add_lwpolyline([(0, 0, 2.0), (2, 0, 0.0)], format="xyb")
+    pl.closed = True
+
+    theta = 4 * atan(2.0)
+    radius = 1.25
+    assert _lwpolyline_length(pl) == pytest.approx(radius * theta + 2.0)
+
+    length, xs, ys = _lwpolyline_length_and_points(pl, max_sagitta=1e-4)
+    assert length == pytest.approx(radius * theta + 2.0)
+    # Tous les points de l'arc sont sur le cercle de centre (1, -0.75).
+    radii = np.hypot(xs[:-1] - 1.0, ys[:-1] + 0.75)
+    assert radii == pytest.approx(np.full(radii.shape, radius))
+    assert _shoelace_area(xs, ys) == pytest.approx(radius**2 * (theta - sin(theta)) / 2, rel=1e-4)
+
+
+def test_hatch_edge_paths_are_measured():
+    ezdxf = pytest.importorskip("ezdxf")
+    from math import pi
+
+    from logic.dxf_engine import DXFProcessor
+
+    doc = ezdxf.new(setup=True)
+    msp = doc.modelspace()
+
+    # Rectangle 500x500 mm fermé par un demi-cercle (r=250 mm), parcouru en sens horaire
+    hatch = msp.add_hatch(dxfattribs={"layer": "CHAPE"})
+    edges = hatch.paths.add_edge_path()
+    edges.add_line((0, 0), (0, 500))
+    edges.add_line((0, 500), (500, 500))
+    edges.add_arc((500, 250), 250, 270, 90, ccw=False)
+    edges.add_line((500, 0), (0, 0))
+
+    with tempfile.TemporaryDirectory() as td:
+        path = Path(td) / "hatch.dxf"
+        doc.saveas(str(path))
+
+        df = DXFProcessor().extract_data(path, scale_factor=0.001)
+
+    # Arc échantillonné à 1 mm de flèche max: l'aire reste à ~1e-3 m² près.
+    chape = df[df["Désignation"] == "CHAPE — Surface totale"]["Quantité"].iloc[0]
+    assert chape == pytest.approx(0.25 + pi * 0.25**2 / 2, abs=1e-3)
+
+
+def test_hatch_island_is_subtracted():
+    ezdxf = pytest.importorskip("ezdxf")
+
+    from logic.dxf_engine import DXFProcessor
+
+    doc = ezdxf.new(setup=True)
+    msp = doc.modelspace()
+
+    # Dalle 2000x2000 mm avec une trémie 500x500 mm (même sens de parcours:
+    # seuls les flags de boucle distinguent contour et îlot).
+    hatch = msp.add_hatch(dxfattribs={"layer": "DALLES"})
+    hatch.paths.add_polyline_path(
+        [(0, 0), (2000, 0), (2000, 2000), (0, 2000)],
+        flags=ezdxf.const.BOUNDARY_PATH_EXTERNAL | ezdxf.const.BOUNDARY_PATH_OUTERMOST,
+    )
+    hatch.paths.add_polyline_path(
+        [(500, 500), (1000, 500), (1000, 1000), (500, 1000)],
+        flags=ezdxf.const.BOUNDARY_PATH_DEFAULT,
+    )
+
+    with tempfile.TemporaryDirectory() as td:
+        path = Path(td) / "island.dxf"
+        doc.saveas(str(path))
+
+        df = DXFProcessor().extract_data(path, scale_factor=0.001)
+
+    dalle = df[df["Désignation"] == "DALLES — Surface totale"]["Quantité"].iloc[0]
+    assert dalle == pytest.approx(4.0 - 0.25)
+
+
+def test_tiny_hatch_symbols_are_skipped():
+    ezdxf = pytest.importorskip("ezdxf")
+
+    from logic.dxf_engine import DXFProcessor
+
+    doc = ezdxf.new(setup=True)
+    msp = doc.modelspace()
+
+    # Chape 1000x1000 mm + un symbole plein de 5x5 mm sur la même couche
+    slab = msp.add_hatch(dxfattribs={"layer": "CHAPE"})
+    slab.paths.add_polyline_path([(0, 0), (1000, 0), (1000, 1000), (0, 1000)])
+    symbol = msp.add_hatch(dxfattribs={"layer": "CHAPE"})
+    symbol.paths.add_polyline_path([(2000, 0), (2005, 0), (2005, 5), (2000, 5)])
+
+    with tempfile.TemporaryDirectory() as td:
+        path = Path(td) / "symbols.dxf"
+        doc.saveas(str(path))
+
+        df = DXFProcessor().extract_data(path, scale_factor=0.001)
+
+    chape = df[df["Désignation"] == "CHAPE — Surface totale"]["Quantité"].iloc[0]
+    assert chape == pytest.approx(1.0)
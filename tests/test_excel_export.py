@@ -0,0 +1,32 @@
+import pytest
+
+
+def test_build_takeoff_excel_bytes_roundtrip():
+    openpyxl = pytest.importorskip("openpyxl")
+
+    from logic.excel_export import build_takeoff_excel_bytes
+
+    rows = [
+        {"Désignation": "MURS — Longueur totale", "Quantité": 12.5, "Unité": "m", "Catégorie": "Linéaires"},
+        {"Désignation": "DALLES — Surface totale", "Quantité": 40.25, "Unité": "m²", "Catégorie": "Surfaces"},
+        {"Désignation": "MENUISERIES — PORTE_90", "Quantité": 3, "Unité": "U", "Catégorie": "Unités"},
+    ]
+
+    wb = openpyxl.load_workbook(build_takeoff_excel_bytes(rows, meta={"filename": "plan.dxf"}))
+    assert wb.sheetnames == ["Métré", "Meta"]
+
+    ws = wb["Métré"]
+    assert ws["A1"].value == "CivilQuant Pro — Métré DXF"
+    assert [str(r) for r in ws.merged_cells.ranges] == ["A1:D1"]
+    assert [c.value for c in ws[3]] == ["Désignation", "Quantité", "Unité", "Catégorie"]
+    assert ws.freeze_panes == "A4"
+    assert ws.tables["TakeoffTable"].ref == "A3:D6"
+
+    assert [ws.cell(row=r, column=2).value for r in (4, 5, 6)] == [12.5, 40.25, 3]
+    assert [ws.cell(row=r, column=2).number_format for r in (4, 5, 6)] == ["0.000", "0.00", "0"]
+    assert ws["B4"].alignment.horizontal == "right"
+    assert ws["A4"].border.left.style == "thin"
+
+    meta_ws = wb["Meta"]
+    assert meta_ws["A1"].value == "Généré le"
+    assert (meta_ws["A3"].value, meta_ws["B3"].value) == ("filename", "plan.dxf")